@@ -0,0 +1,43 @@
+"""
+Author lookups for the normalized authors / paper_authors tables
+"""
+from sqlalchemy import select
+
+from models import Author, PaperAuthor
+
+LOOKUP_CHUNK_SIZE = 500
+
+
+def resolve_authors(db, names, known: dict):
+    """Return Author rows for `names`, creating missing ones
+
+    `known` maps normalized name -> Author and is shared across calls so a
+    scrape or backfill only looks each author up once.
+    """
+    normalized = {}
+    for name in names:
+        key = Author.normalize(name)
+        if key:
+            normalized.setdefault(key, name)
+
+    missing = [key for key in normalized if key not in known]
+    for start in range(0, len(missing), LOOKUP_CHUNK_SIZE):
+        chunk = missing[start:start + LOOKUP_CHUNK_SIZE]
+        for author in db.execute(select(Author).where(Author.normalized_name.in_(chunk))).scalars():
+            known[author.normalized_name] = author
+
+    authors = []
+    for key, name in normalized.items():
+        if key not in known:
+            known[key] = Author(name=name, normalized_name=key)
+            db.add(known[key])
+        authors.append(known[key])
+    return authors
+
+
+def author_links(db, names, known: dict):
+    """Build the PaperAuthor rows for a paper's author list"""
+    return [
+        PaperAuthor(author=author, position=position)
+        for position, author in enumerate(resolve_authors(db, names, known))
+    ]
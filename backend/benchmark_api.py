@@ -0,0 +1,185 @@
+"""
+End-to-end API benchmark
+
+Drives the main read and write paths (feeds, search, comment trees, paper
+votes, login and register) against a corpus from generate_corpus.py, either
+in-process through an ASGI client on DATABASE_URL or against a running
+server with --url. Each scenario runs --requests requests at --concurrency,
+and the results (p50/p95/p99 latency, throughput, errors per scenario) are
+printed as JSON, so a change can be measured before and after on the same
+dataset.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench.db python benchmark_api.py --output before.json
+    python benchmark_api.py --scenarios feed_hot,search --requests 500 --concurrency 50
+    python benchmark_api.py --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmark_login import percentile
+from generate_corpus import BENCH_PASSWORD, WORDS
+
+
+def local_client():
+    """ASGI client for the app on DATABASE_URL"""
+    # Every request comes from one client; don't let rate limits cap the numbers
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import main
+    from database import init_db
+
+    init_db()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=60)
+
+
+class Scenario:
+    def __init__(self, name: str, make_request):
+        self.name = name
+        self.make_request = make_request  # rng -> (method, path, kwargs)
+
+
+def build_scenarios(arxiv_ids, user_count: int):
+    def feed(sort):
+        return lambda rng: ("GET", "/papers", {"params": {"sort": sort, "limit": 30}})
+
+    def search(rng):
+        return "GET", "/search", {"params": {"q": " ".join(rng.sample(WORDS, rng.choice((1, 2)))), "limit": 50}}
+
+    def comments(rng):
+        return "GET", f"/papers/{rng.choice(arxiv_ids)}/comments", {}
+
+    def vote(rng):
+        # A fresh anonymous voter each time, so every request inserts a vote
+        return "POST", f"/papers/{rng.choice(arxiv_ids)}/vote", {
+            "params": {"user_identifier": f"bench-{uuid.uuid4().hex}"}
+        }
+
+    def login(rng):
+        user = rng.randint(1, user_count)
+        return "POST", "/auth/login", {"json": {"email": f"user{user}@example.com", "password": BENCH_PASSWORD}}
+
+    def register(rng):
+        name = f"bench{uuid.uuid4().hex[:12]}"
+        return "POST", "/auth/register", {
+            "json": {"username": name, "email": f"{name}@example.com", "password": BENCH_PASSWORD}
+        }
+
+    return {scenario.name: scenario for scenario in (
+        Scenario("feed_hot", feed("hot")),
+        Scenario("feed_new", feed("new")),
+        Scenario("feed_top", feed("votes")),
+        Scenario("search", search),
+        Scenario("comments", comments),
+        Scenario("vote", vote),
+        Scenario("login", login),
+        Scenario("register", register),
+    )}
+
+
+async def sample_papers(client, pages: int = 5):
+    """arXiv ids of the most discussed papers, so comment trees aren't empty"""
+    arxiv_ids = []
+    cursor = None
+    for _ in range(pages):
+        params = {"sort": "comments", "limit": 100}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/papers", params=params)
+        response.raise_for_status()
+        body = response.json()
+        arxiv_ids.extend(paper["arxiv_id"] for paper in body["papers"])
+        cursor = body.get("next_cursor")
+        if not cursor:
+            break
+    if not arxiv_ids:
+        raise SystemExit("❌ No papers found; fill the database with generate_corpus.py first")
+    return arxiv_ids
+
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int, rng) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    calls = [scenario.make_request(rng) for _ in range(requests)]
+
+    async def one(method, path, kwargs):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            return ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(*call) for call in calls))
+    elapsed = time.perf_counter() - start
+
+    latencies = [duration for _, duration in results]
+    return {
+        "requests": requests,
+        "errors": sum(1 for ok, _ in results if not ok),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+async def run(args):
+    client = httpx.AsyncClient(base_url=args.url, timeout=60) if args.url else local_client()
+    rng = random.Random(args.seed)
+
+    async with client:
+        status = (await client.get("/status")).json()
+        scenarios = build_scenarios(await sample_papers(client), max(1, status.get("total_users") or 1))
+
+        names = args.scenarios.split(",") if args.scenarios else list(scenarios)
+        unknown = [name for name in names if name not in scenarios]
+        if unknown:
+            raise SystemExit(f"❌ Unknown scenarios: {', '.join(unknown)} (have {', '.join(scenarios)})")
+
+        results = {}
+        for name in names:
+            if args.warmup:
+                await run_scenario(client, scenarios[name], args.warmup, args.concurrency, rng)
+            results[name] = await run_scenario(client, scenarios[name], args.requests, args.concurrency, rng)
+            print(f"✓ {name}: {results[name]['throughput_rps']} req/s, p50 {results[name]['p50_ms']} ms, "
+                  f"p99 {results[name]['p99_ms']} ms", file=sys.stderr)
+
+    report = {
+        "target": args.url or "in-process",
+        "dataset": {key: status.get(key) for key in (
+            "total_papers", "total_votes", "total_comments", "total_posts", "total_users"
+        )},
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup,
+                   "seed": args.seed},
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the main API routes")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per scenario first")
+    parser.add_argument("--scenarios", help="Comma-separated subset (default: all)")
+    parser.add_argument("--url", help="Benchmark a running server instead of an in-process app")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
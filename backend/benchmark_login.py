@@ -0,0 +1,108 @@
+"""
+Login throughput benchmark
+
+Fires concurrent POST /auth/login requests and, alongside them, cheap GET /
+requests, to show both how many logins per second we sustain and whether
+hashing starves the rest of the API. Runs the app in-process against a
+throwaway SQLite database unless --url points at a running server.
+
+Usage:
+    python benchmark_login.py --requests 200 --concurrency 20
+    BCRYPT_ROUNDS=10 PASSWORD_HASH_WORKERS=0 python benchmark_login.py
+    python benchmark_login.py --url http://localhost:8000 --email me@example.com --password secret
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "benchmark-password"
+
+
+def local_client():
+    """ASGI client for the app on a temporary database"""
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    # Every request comes from one client; don't let the login rate limit cap the numbers
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import main
+    from database import init_db
+
+    init_db()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench")
+
+
+async def timed(client, method, path, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, path, **kwargs)
+    return response.status_code, time.perf_counter() - start
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+async def run(args):
+    client = httpx.AsyncClient(base_url=args.url, timeout=60) if args.url else local_client()
+    email, password = args.email, args.password
+
+    async with client:
+        if not args.url:
+            response = await client.post("/auth/register", json={
+                "username": "bench", "email": email, "password": password
+            })
+            response.raise_for_status()
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        logins_done = asyncio.Event()
+
+        async def login():
+            async with semaphore:
+                return await timed(client, "POST", "/auth/login", json={"email": email, "password": password})
+
+        async def probe():
+            # Latency of a trivial route while logins are in flight
+            samples = []
+            while not logins_done.is_set():
+                samples.append((await timed(client, "GET", "/"))[1])
+                await asyncio.sleep(0.01)
+            return samples
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(login() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - start
+        logins_done.set()
+        probe_samples = await probe_task
+
+    failures = sum(1 for status_code, _ in results if status_code != 200)
+    latencies = [duration for _, duration in results]
+
+    print(f"📊 {args.requests} logins, concurrency {args.concurrency}, "
+          f"BCRYPT_ROUNDS={os.getenv('BCRYPT_ROUNDS', '12')}, "
+          f"PASSWORD_HASH_WORKERS={os.getenv('PASSWORD_HASH_WORKERS', 'default')}")
+    print(f"   throughput: {args.requests / elapsed:.1f} logins/s ({failures} failed)")
+    print(f"   login latency: p50 {statistics.median(latencies) * 1000:.0f} ms, "
+          f"p95 {percentile(latencies, 95) * 1000:.0f} ms")
+    if probe_samples:
+        print(f"   GET / while logging in: p50 {statistics.median(probe_samples) * 1000:.1f} ms, "
+              f"p95 {percentile(probe_samples, 95) * 1000:.1f} ms ({len(probe_samples)} requests)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /auth/login throughput")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--url", help="Benchmark a running server instead of an in-process app")
+    parser.add_argument("--email", default=BENCH_EMAIL)
+    parser.add_argument("--password", default=BENCH_PASSWORD)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,246 @@
+"""
+Response cache for read-heavy endpoints
+
+Serialized JSON bodies are cached per route + query params in an in-process
+LRU with a TTL, or in Redis when CACHE_URL is set so several workers share
+one cache. Keys are grouped into namespaces ("papers", "posts",
+"paper:<arxiv_id>") and every namespace carries a generation token;
+invalidating a namespace just swaps its token, so writes never have to scan
+the cache.
+
+The generation also versions the response for HTTP validation: it yields a
+weak ETag and a Last-Modified date, so a client that already has the current
+version gets a 304 without the route querying or serializing anything.
+Generations expire after the cache TTL, which bounds how stale a time-window
+feed (or another worker's cache) can be.
+
+Reads and stores are awaited from async routes: Redis round trips run in the
+default thread pool so they don't block the event loop, while the in-process
+backend is called directly. Invalidation stays synchronous for the sync
+routes and background jobs that write.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import urlencode
+
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+CACHE_URL = os.getenv("CACHE_URL")  # e.g. redis://localhost:6379/0
+
+
+class LRUCache:
+    """Thread-safe LRU map whose entries also expire after a TTL"""
+
+    def __init__(self, maxsize: int, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def new_generation() -> str:
+    # Millisecond timestamp + random suffix: never reused, and records when the data changed
+    return f"{int(time.time() * 1000):x}-{uuid.uuid4().hex[:8]}"
+
+
+class MemoryBackend:
+    """Per-process cache storage"""
+
+    blocking = False
+
+    def __init__(self, maxsize: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.entries = LRUCache(maxsize)
+        # Losing a generation only invalidates its namespace, so these can be evicted too
+        self.generations = LRUCache(maxsize, ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value, ttl: float):
+        self.entries.set(key, value, ttl)
+
+    def generation(self, namespace: str) -> str:
+        with self._lock:
+            current = self.generations.get(namespace)
+            if current is None:
+                current = new_generation()
+                self.generations.set(namespace, current)
+            return current
+
+    def bump(self, namespace: str):
+        self.generations.set(namespace, new_generation())
+
+    def clear(self):
+        self.entries.clear()
+        self.generations.clear()
+
+
+class RedisBackend:
+    """Cache storage shared by every worker through Redis (needs the `redis` package)"""
+
+    blocking = True  # network round trips
+
+    def __init__(self, url: str, ttl: float = CACHE_TTL_SECONDS):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_URL is set but the 'redis' package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.generation_ttl_ms = int(ttl * 1000) or None
+
+    def get(self, key):
+        return self.client.get(f"cache:{key}")
+
+    def set(self, key, value, ttl: float):
+        self.client.set(f"cache:{key}", value, px=int(ttl * 1000) if ttl else None)
+
+    def generation(self, namespace: str) -> str:
+        key = f"gen:{namespace}"
+        self.client.set(key, new_generation(), nx=True, px=self.generation_ttl_ms)
+        return self.client.get(key).decode()
+
+    def bump(self, namespace: str):
+        self.client.set(f"gen:{namespace}", new_generation(), px=self.generation_ttl_ms)
+
+    def clear(self):
+        for key in self.client.scan_iter("cache:*"):
+            self.client.delete(key)
+
+
+class CacheLookup:
+    """Cache key and HTTP validators for one request against the current generation"""
+
+    def __init__(self, key: str, generation: str, vary: str = None):
+        self.key = key
+        self.vary = vary
+        # Weak: the same body is sent as br, gzip or identity, which aren't byte-identical
+        self.etag = f'W/"{hashlib.sha1(key.encode()).hexdigest()[:24]}"'
+        millis = int(generation.split("-", 1)[0], 16)
+        self.modified_at = datetime.fromtimestamp(millis / 1000, tz=timezone.utc)
+        # HTTP dates have one-second resolution
+        self.last_modified = self.modified_at.replace(microsecond=0)
+
+    @property
+    def headers(self) -> dict:
+        headers = {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # Let browsers keep the body but revalidate it on every poll
+            "Cache-Control": "no-cache",
+        }
+        if self.vary:
+            headers["Vary"] = self.vary
+        return headers
+
+    def not_modified(self, request) -> bool:
+        """True if the client's If-None-Match / If-Modified-Since already covers this version"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # Weak comparison. "*" isn't honoured: this runs before the route knows the resource exists
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return self.etag.removeprefix("W/") in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                # Against the exact time, not the truncated header: a client holding a version
+                # from earlier in the same second must not get a 304 for a newer one
+                return parsedate_to_datetime(if_modified_since) >= self.modified_at
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl: float = CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def lookup(self, namespace: str, request, variant: str = None) -> CacheLookup:
+        """Cache key for a request: namespace generation + path + sorted query params
+
+        `variant` names the viewer ("user:42") for responses that differ per
+        logged-in user; they're keyed separately and sent with Vary: Authorization.
+        """
+        generation = await self._call(self.backend.generation, namespace)
+        params = urlencode(sorted(request.query_params.multi_items()))
+        key = f"{namespace}:{generation}:{request.url.path}?{params}"
+        if variant is None:
+            return CacheLookup(key, generation)
+        return CacheLookup(f"{key}#{variant}", generation, vary="Authorization")
+
+    async def get(self, key: str):
+        if not self.enabled:
+            return None
+        return await self._call(self.backend.get, key)
+
+    async def set(self, key: str, body: bytes):
+        if self.enabled:
+            await self._call(self.backend.set, key, body, self.ttl)
+
+    async def _call(self, method, *args):
+        """Run a backend call; Redis round trips go to the thread pool, off the event loop"""
+        if not self.backend.blocking:
+            return method(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, method, *args)
+
+    def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            self.backend.bump(namespace)
+
+    def clear(self):
+        self.backend.clear()
+
+
+def create_backend():
+    if CACHE_URL:
+        return RedisBackend(CACHE_URL)
+    return MemoryBackend()
+
+
+response_cache = ResponseCache(create_backend())
@@ -0,0 +1,75 @@
+"""
+Load a paper's threaded comments in one query
+
+A recursive CTE walks from the top-level comments down through their replies
+(optionally capped by thread count and depth), joined to the authors, and the
+tree is assembled in memory from an id -> node map.
+"""
+from sqlalchemy import literal, select
+
+from models import Comment, CommentVote, User
+
+
+def comment_tree_query(paper_id: int, max_depth: int = None, limit: int = None):
+    """Select (Comment, username) rows for the newest `limit` threads, `max_depth` levels deep"""
+    roots = (
+        select(Comment.id)
+        .where(Comment.paper_id == paper_id, Comment.parent_id.is_(None))
+        .order_by(Comment.created_at.desc(), Comment.id.desc())
+    )
+    if limit is not None:
+        roots = roots.limit(limit)
+
+    tree = (
+        select(Comment.id.label("id"), literal(1).label("depth"))
+        .where(Comment.id.in_(roots))
+        .cte("comment_tree", recursive=True)
+    )
+    replies = select(Comment.id, tree.c.depth + 1).where(Comment.parent_id == tree.c.id)
+    if max_depth is not None:
+        replies = replies.where(tree.c.depth < max_depth)
+    tree = tree.union_all(replies)
+
+    return (
+        select(Comment, User.username)
+        .join(tree, tree.c.id == Comment.id)
+        .outerjoin(User, User.id == Comment.user_id)
+        .order_by(Comment.created_at.asc(), Comment.id.asc())
+    )
+
+
+def user_votes_query(user_id: int, comment_ids):
+    """Select which of `comment_ids` the user has upvoted"""
+    return select(CommentVote.comment_id).where(
+        CommentVote.user_id == user_id,
+        CommentVote.comment_id.in_(comment_ids)
+    )
+
+
+def build_comment_tree(rows, user_votes=frozenset()):
+    """Nest (Comment, username) rows: threads newest first, replies oldest first"""
+    nodes = {}
+    roots = []
+
+    # Rows arrive oldest first, so appending keeps replies in chronological order
+    for comment, username in rows:
+        nodes[comment.id] = {
+            "id": comment.id,
+            "user_id": comment.user_id,
+            "username": username or "deleted",
+            "content": comment.content,
+            "vote_count": comment.vote_count,
+            "created_at": comment.created_at.isoformat(),
+            "user_voted": comment.id in user_votes,
+            "replies": []
+        }
+
+    for comment, _ in rows:
+        parent = nodes.get(comment.parent_id)
+        if parent is not None:
+            parent["replies"].append(nodes[comment.id])
+        elif comment.parent_id is None:
+            roots.append(nodes[comment.id])
+
+    roots.reverse()
+    return roots
@@ -1,7 +1,10 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from models import Base
+from search import init_search_index
 
 # Database URL from environment variable or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./arxiv_news.db")
@@ -10,18 +13,120 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./arxiv_news.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-# Create engine with appropriate settings
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# Connection pool (per engine, per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# SQLite tuning: WAL lets readers keep going while the scraper commits
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+
+
+def is_memory_database(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(url) -> dict:
+    """Pool settings for create_engine / create_async_engine"""
+    if is_memory_database(url):
+        # In-memory SQLite lives in a single connection, so there's no pool to size
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite settings (WAL and synchronous=NORMAL persist in the file anyway)"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.close()
+
+
+def configure_engine(sync_engine):
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", set_sqlite_pragmas)
+    return sync_engine
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    """Sync engine with the pool settings and (on SQLite) pragmas applied"""
+    connect_args = {}
+    if make_url(url).get_backend_name() == "sqlite":
+        connect_args = {"check_same_thread": False}
+
+    return configure_engine(create_engine(url, connect_args=connect_args, **engine_options(url)))
+
+
+def async_database_url(url: str):
+    """Same database through an asyncio driver (aiosqlite / asyncpg)"""
+    url = make_url(url)
+    async_connect_args = {}
+
+    if url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    elif url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg spells libpq's sslmode as the `ssl` connect argument
+        if "sslmode" in url.query:
+            async_connect_args["ssl"] = url.query["sslmode"]
+            url = url.difference_update_query(["sslmode"])
+
+    return url, async_connect_args
+
+
+def create_async_db_engine(url: str = DATABASE_URL):
+    """Async engine with the same pool settings and pragmas as create_db_engine"""
+    async_url, async_connect_args = async_database_url(url)
+    async_engine = create_async_engine(async_url, connect_args=async_connect_args, **engine_options(url))
+    configure_engine(async_engine.sync_engine)
+    return async_engine
+
+
+def pool_stats() -> dict:
+    """Current pool usage for both engines"""
+    stats = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        stats[name] = {"pool": type(pool).__name__, "status": pool.status()}
+        # Only QueuePool-style pools can report how many connections are in use
+        if hasattr(pool, "checkedout"):
+            stats[name].update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                # SQLAlchemy counts up from -size; only connections past the pool size matter
+                "overflow": max(pool.overflow(), 0),
+            })
+    return stats
+
+
+engine = create_db_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the read-heavy routes, so they don't hold a threadpool slot
+async_engine = create_async_db_engine(DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 # Create all tables
 def init_db():
     Base.metadata.create_all(bind=engine)
+    init_search_index(engine)
 
 # Dependency for FastAPI routes
 def get_db():
@@ -29,4 +134,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency for async FastAPI routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
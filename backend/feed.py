@@ -0,0 +1,131 @@
+"""
+Server-side feed queries for GET /papers
+
+Feeds are filtered by category and publication window in the database and
+paginated with a keyset cursor on (sort column, id), so every page is a single
+index scan no matter how deep the reader scrolls. Windows are a range on the
+typed, indexed published_at column.
+"""
+import base64
+import json
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, tuple_
+
+from models import Paper, PaperAuthor, PaperCategory
+
+DEFAULT_PAGE_SIZE = 30
+MAX_PAGE_SIZE = 100
+
+# Frontend sort names (hot/new/discussed) plus the legacy API names
+SORT_COLUMNS = {
+    "hot": Paper.hot_score,
+    "votes": Paper.vote_count,
+    "new": Paper.published_at,
+    "recent": Paper.published_at,
+    "discussed": Paper.comment_count,
+    "comments": Paper.comment_count,
+}
+
+WINDOW_ALIASES = {
+    "all": None,
+    "day": "24h",
+    "week": "7d",
+    "month": "30d",
+    "year": "365d",
+}
+
+
+class FeedError(ValueError):
+    """Raised for an unknown sort, window or a malformed cursor"""
+
+
+def parse_window(window: str):
+    """Turn '24h', '7d', 'week' or 'all' into a cutoff datetime (or None)"""
+    window = WINDOW_ALIASES.get(window, window)
+    if window is None:
+        return None
+
+    match = re.fullmatch(r"(\d+)([hd])", window)
+    if not match:
+        raise FeedError(f"Invalid window: {window}")
+
+    amount, unit = int(match.group(1)), match.group(2)
+    delta = timedelta(hours=amount) if unit == "h" else timedelta(days=amount)
+    return datetime.utcnow() - delta
+
+
+def encode_cursor(score, paper_id: int) -> str:
+    raw = json.dumps([score, paper_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, paper_id = json.loads(base64.urlsafe_b64decode(padded))
+        return score, int(paper_id)
+    except (ValueError, TypeError):
+        raise FeedError("Invalid cursor")
+
+
+def category_filter(category: str):
+    """Match papers in a category ('cs.LG') or anywhere in an archive ('cs', 'quant-ph')"""
+    column = PaperCategory.category if "." in category else PaperCategory.archive
+    return Paper.id.in_(select(PaperCategory.paper_id).where(column == category))
+
+
+def build_feed_query(sort: str = "hot", category: str = None, window: str = "all",
+                     cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, author_id: int = None):
+    """Build the select for one feed page (fetches limit + 1 rows to detect a next page)"""
+    if sort not in SORT_COLUMNS:
+        raise FeedError(f"Invalid sort: {sort}")
+    sort_column = SORT_COLUMNS[sort]
+
+    query = select(Paper)
+
+    if category and category != "all":
+        query = query.where(category_filter(category))
+
+    if author_id is not None:
+        query = query.where(Paper.id.in_(
+            select(PaperAuthor.paper_id).where(PaperAuthor.author_id == author_id)
+        ))
+
+    cutoff = parse_window(window)
+    if cutoff is not None:
+        query = query.where(Paper.published_at >= cutoff)
+
+    if sort_column is Paper.published_at:
+        # Papers whose date couldn't be parsed have no place in a chronological feed
+        query = query.where(Paper.published_at.is_not(None))
+
+    if cursor:
+        score, last_id = decode_cursor(cursor)
+        if sort_column is Paper.published_at:
+            # Timestamps travel as ISO strings
+            try:
+                score = Paper.parse_timestamp(score)
+            except (AttributeError, TypeError, ValueError):
+                raise FeedError("Invalid cursor")
+        query = query.where(tuple_(sort_column, Paper.id) < tuple_(score, last_id))
+
+    return (
+        query
+        .order_by(sort_column.desc(), Paper.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def paginate(papers, sort: str, limit: int):
+    """Split the limit + 1 rows into (page, next_cursor)"""
+    if len(papers) <= limit:
+        return papers, None
+
+    page = papers[:limit]
+    last = page[-1]
+    score = getattr(last, SORT_COLUMNS[sort].key)
+    if isinstance(score, datetime):
+        score = score.isoformat()
+    return page, encode_cursor(score, last.id)
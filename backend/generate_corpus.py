@@ -0,0 +1,342 @@
+"""
+Synthetic corpus for benchmarks
+
+Fills an empty database (DATABASE_URL, SQLite or Postgres) with production-
+shaped data: papers with real arXiv categories and JSON author lists spread
+over --days of publication dates, heavy-tailed (Pareto) votes and comments
+per paper, deep comment threads, users, posts and post comments. Rows go in
+with bulk executemany inserts, --batch-size rows per transaction, and the
+random seed is fixed so every run builds the same dataset.
+
+Denormalized counts, karma, hot scores and stats_counters are then filled in
+by the same code that maintains them in production (reconcile, ranking,
+stats). Every user's password is BENCH_PASSWORD, so benchmark_api.py can log
+in as user{n}@example.com.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench.db python generate_corpus.py
+    python generate_corpus.py --papers 10000 --votes 100000 --users 2000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+BENCH_PASSWORD = "benchmark-password"
+
+# (category, relative frequency), roughly arXiv's mix of new submissions
+CATEGORIES = [
+    ("cs.LG", 14), ("cs.CV", 10), ("cs.CL", 9), ("cs.AI", 7), ("cs.RO", 3), ("cs.CR", 3),
+    ("cs.DS", 1), ("cs.IR", 2), ("cs.NE", 1), ("cs.SE", 2), ("stat.ML", 5), ("stat.ME", 2),
+    ("math.PR", 2), ("math.OC", 3), ("math.AP", 2), ("math.CO", 2), ("math.NA", 2),
+    ("quant-ph", 6), ("hep-th", 3), ("hep-ph", 3), ("gr-qc", 2), ("astro-ph.CO", 2),
+    ("astro-ph.GA", 2), ("cond-mat.mes-hall", 2), ("cond-mat.str-el", 2), ("physics.optics", 2),
+    ("eess.SP", 2), ("eess.IV", 2), ("q-bio.NC", 1), ("econ.EM", 1),
+]
+
+FIRST_NAMES = [
+    "Alice", "Bo", "Carlos", "Dmitri", "Elena", "Fatima", "Guo", "Hiroshi", "Ingrid", "Jamal",
+    "Kavya", "Lukas", "Mei", "Nikolai", "Olga", "Pierre", "Qiang", "Rahul", "Sofia", "Tomasz",
+    "Uma", "Viktor", "Wei", "Xin", "Yusuf", "Zoe",
+]
+LAST_NAMES = [
+    "Smith", "Wang", "Li", "Zhang", "Kumar", "Garcia", "Müller", "Ivanov", "Kim", "Nguyen",
+    "Rossi", "Tanaka", "Silva", "Cohen", "Okafor", "Novak", "Schmidt", "Chen", "Patel", "Dubois",
+    "Johansson", "Kowalski", "Haddad", "Moreau", "Yamamoto", "Fischer", "Lopez", "Sato",
+]
+WORDS = (
+    "neural network transformer attention diffusion model learning graph quantum field theory "
+    "sparse estimation inference bayesian optimal control reinforcement policy gradient kernel "
+    "manifold topology spectral convex stochastic process equilibrium dynamics entropy language "
+    "vision robust adversarial federated causal representation contrastive generative scaling "
+    "benchmark dataset efficient fast provable bounds lattice gauge dark matter galaxy cluster "
+    "superconductivity spin chain qubit error correction signal recovery tensor decomposition"
+).split()
+COMMENT_TEXT = [
+    "Great paper, the ablations are convincing.",
+    "How does this compare to the baseline in Table 2?",
+    "I'm not sure the assumption in Section 3 holds in practice.",
+    "Code link?",
+    "This is essentially a rediscovery of an older result.",
+    "Nice, we saw the same effect in our experiments.",
+    "The proof of Lemma 4 seems to skip a step.",
+]
+
+
+def sentence(rng, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize()
+
+
+def allocate(rng, total: int, count: int, cap: int, alpha: float = 1.3):
+    """Split `total` items over `count` owners with Pareto weights, at most `cap` each"""
+    if count == 0:
+        return []
+    weights = [rng.paretovariate(alpha) for _ in range(count)]
+    scale = total / sum(weights)
+    return [min(cap, int(weight * scale + rng.random())) for weight in weights]
+
+
+class BulkWriter:
+    """Buffers rows for one table and inserts them batch_size at a time, one transaction each"""
+
+    def __init__(self, db, model, batch_size: int):
+        self.db = db
+        self.table = model.__table__
+        self.batch_size = batch_size
+        self.rows = []
+        self.written = 0
+
+    def add(self, row: dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.db.execute(insert(self.table), self.rows)
+            self.db.commit()
+            self.written += len(self.rows)
+            self.rows = []
+
+
+def generate(db, args):
+    # Imported late so DATABASE_URL from the command line is picked up
+    import reconcile
+    import ranking
+    from models import (
+        Author, Comment, CommentVote, Paper, PaperAuthor, PaperCategory, Post, PostComment,
+        PostCommentVote, PostVote, User, Vote
+    )
+    from passwords import hash_password_sync
+    from stats import stats_counters
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    batch = args.batch_size
+
+    def step(message):
+        print(f"⏳ {message}...")
+        return time.perf_counter()
+
+    def done(started, count, what):
+        print(f"✓ {count:,} {what} in {time.perf_counter() - started:.1f}s")
+
+    # Users share one hash; hashing a million passwords would dominate the run
+    started = step("Users")
+    password_hash = hash_password_sync(BENCH_PASSWORD)
+    users = BulkWriter(db, User, batch)
+    for user_id in range(1, args.users + 1):
+        users.add({
+            "id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.com",
+            "password_hash": password_hash, "karma": 0,
+            "created_at": now - timedelta(days=rng.uniform(0, args.days)),
+        })
+    users.flush()
+    done(started, users.written, "users")
+
+    started = step("Authors")
+    # "Elena K. R. Ivanov": enough distinct names that most authors appear on a handful of papers
+    initials = [chr(c) for c in range(ord("A"), ord("Z") + 1)]
+    distinct_names = len(FIRST_NAMES) * len(initials) ** 2 * len(LAST_NAMES)
+    author_count = max(1, min(args.papers // 2, distinct_names * 3 // 4))
+    seen = set()
+    author_pool = []
+    authors = BulkWriter(db, Author, batch)
+    while len(author_pool) < author_count:
+        name = (f"{rng.choice(FIRST_NAMES)} {rng.choice(initials)}. {rng.choice(initials)}. "
+                f"{rng.choice(LAST_NAMES)}")
+        key = Author.normalize(name)
+        if key not in seen:
+            seen.add(key)
+            author_pool.append((name, len(author_pool) + 1))
+            authors.add({"id": len(author_pool), "name": name, "normalized_name": key})
+    authors.flush()
+    done(started, authors.written, "authors")
+
+    started = step("Papers")
+    category_names = [name for name, _ in CATEGORIES]
+    category_weights = [weight for _, weight in CATEGORIES]
+    published_at = []
+    papers = BulkWriter(db, Paper, batch)
+    paper_categories = BulkWriter(db, PaperCategory, batch)
+    paper_authors = BulkWriter(db, PaperAuthor, batch)
+    month_sequence = {}
+    for paper_id in range(1, args.papers + 1):
+        # Newest first, evenly spread over --days
+        published = now - timedelta(seconds=(paper_id / args.papers) * args.days * 86400)
+        published_at.append(published)
+        month = published.strftime("%y%m")
+        month_sequence[month] = month_sequence.get(month, 0) + 1
+
+        categories = list(dict.fromkeys(
+            rng.choices(category_names, category_weights, k=rng.choice((1, 1, 2, 2, 3)))
+        ))
+        chosen_authors = rng.sample(author_pool, min(len(author_pool), rng.choice((1, 2, 3, 3, 4, 5, 8))))
+        stamp = published.strftime("%Y-%m-%dT%H:%M:%SZ")
+        arxiv_id = f"{month}.{month_sequence[month]:05d}"
+
+        papers.add({
+            "id": paper_id, "arxiv_id": arxiv_id, "title": sentence(rng, 5, 12),
+            "authors": json.dumps([name for name, _ in chosen_authors], ensure_ascii=False),
+            "abstract": " ".join(sentence(rng, 12, 25) + "." for _ in range(rng.randint(4, 8))),
+            "pdf_url": f"https://arxiv.org/pdf/{arxiv_id}", "arxiv_url": f"https://arxiv.org/abs/{arxiv_id}",
+            "published": stamp, "updated": stamp, "categories": json.dumps(categories),
+            "primary_category": categories[0], "published_at": published, "updated_at": published,
+            "created_at": published,
+            "vote_count": 0, "comment_count": 0, "hot_score": 0.0,
+        })
+        for category in categories:
+            paper_categories.add({
+                "paper_id": paper_id, "category": category, "archive": PaperCategory.archive_of(category)
+            })
+        for position, (_, author_id) in enumerate(chosen_authors):
+            paper_authors.add({"paper_id": paper_id, "author_id": author_id, "position": position})
+    for writer in (papers, paper_categories, paper_authors):
+        writer.flush()
+    done(started, papers.written, "papers")
+
+    # Popular papers get both the votes and the discussion
+    started = step("Paper votes")
+    voter_pool = args.users + args.anonymous_voters
+    vote_counts = allocate(rng, args.votes, args.papers, voter_pool)
+    votes = BulkWriter(db, Vote, batch)
+    for paper_id, count in enumerate(vote_counts, start=1):
+        for voter in rng.sample(range(voter_pool), count):
+            # Logged-in votes are keyed by user id, anonymous ones by a client identifier
+            identifier = str(voter + 1) if voter < args.users else f"anon-{voter}"
+            votes.add({
+                "paper_id": paper_id, "user_identifier": identifier,
+                "created_at": published_at[paper_id - 1] + timedelta(minutes=rng.randint(1, 4000)),
+            })
+    votes.flush()
+    done(started, votes.written, "votes")
+
+    started = step("Comment threads")
+    comment_counts = allocate(rng, args.comments, args.papers, args.max_thread)
+    comments = BulkWriter(db, Comment, batch)
+    comment_id = 0
+    for paper_id, count in enumerate(comment_counts, start=1):
+        thread = []
+        created_at = published_at[paper_id - 1]
+        for _ in range(count):
+            comment_id += 1
+            parent_id = None
+            if thread and rng.random() < 0.75:
+                # Mostly replies to the latest comment, which builds deep chains
+                parent_id = thread[-1] if rng.random() < 0.6 else rng.choice(thread)
+            created_at += timedelta(minutes=rng.randint(1, 240))
+            comments.add({
+                "id": comment_id, "paper_id": paper_id, "user_id": rng.randint(1, args.users),
+                "parent_id": parent_id, "content": rng.choice(COMMENT_TEXT), "vote_count": 0,
+                "created_at": created_at,
+            })
+            thread.append(comment_id)
+    comments.flush()
+    done(started, comments.written, "comments")
+
+    started = step("Comment votes")
+    comment_votes = BulkWriter(db, CommentVote, batch)
+    for target_id, count in enumerate(allocate(rng, args.comment_votes, comment_id, args.users), start=1):
+        for voter in rng.sample(range(1, args.users + 1), count):
+            comment_votes.add({"comment_id": target_id, "user_id": voter})
+    comment_votes.flush()
+    done(started, comment_votes.written, "comment votes")
+
+    started = step("Posts")
+    posts = BulkWriter(db, Post, batch)
+    post_created = []
+    for post_id in range(1, args.posts + 1):
+        created_at = now - timedelta(seconds=(post_id / max(args.posts, 1)) * args.days * 86400)
+        post_created.append(created_at)
+        has_url = rng.random() < 0.6
+        posts.add({
+            "id": post_id, "user_id": rng.randint(1, args.users), "title": sentence(rng, 4, 10),
+            "url": f"https://example.com/{post_id}" if has_url else None,
+            "text": None if has_url else " ".join(sentence(rng, 8, 20) for _ in range(3)),
+            "vote_count": 0, "comment_count": 0, "created_at": created_at,
+        })
+    posts.flush()
+    done(started, posts.written, "posts")
+
+    started = step("Post comments and votes")
+    post_votes = BulkWriter(db, PostVote, batch)
+    for post_id, count in enumerate(allocate(rng, args.post_votes, args.posts, args.users), start=1):
+        for voter in rng.sample(range(1, args.users + 1), count):
+            post_votes.add({"post_id": post_id, "user_id": voter})
+    post_votes.flush()
+
+    post_comments = BulkWriter(db, PostComment, batch)
+    post_comment_id = 0
+    for post_id, count in enumerate(allocate(rng, args.post_comments, args.posts, args.max_thread), start=1):
+        created_at = post_created[post_id - 1]
+        for _ in range(count):
+            post_comment_id += 1
+            created_at += timedelta(minutes=rng.randint(1, 240))
+            post_comments.add({
+                "id": post_comment_id, "post_id": post_id, "user_id": rng.randint(1, args.users),
+                "content": rng.choice(COMMENT_TEXT), "vote_count": 0, "created_at": created_at,
+            })
+    post_comments.flush()
+
+    post_comment_votes = BulkWriter(db, PostCommentVote, batch)
+    for target_id, count in enumerate(
+        allocate(rng, args.post_comments // 2, post_comment_id, args.users), start=1
+    ):
+        for voter in rng.sample(range(1, args.users + 1), count):
+            post_comment_votes.add({"comment_id": target_id, "user_id": voter})
+    post_comment_votes.flush()
+    done(started, post_votes.written + post_comments.written + post_comment_votes.written, "post rows")
+
+    # Explicit ids leave Postgres sequences behind the data
+    if db.get_bind().dialect.name == "postgresql":
+        for table in ("users", "authors", "papers", "comments", "posts", "post_comments"):
+            db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+            ))
+        db.commit()
+
+    started = step("Counts, karma, hot scores and stats")
+    reconcile.reconcile_counters(db, batch_size=max(batch, 1000))
+    ranking.refresh_hot_scores(db, window_days=None)
+    stats_counters.recount(db)
+    done(started, db.execute(select(func.count(Paper.id))).scalar(), "papers scored")
+
+
+def main(args):
+    from database import SessionLocal, init_db
+    from models import Paper
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if db.execute(select(Paper.id).limit(1)).first() is not None:
+            print("❌ The database already has papers; point DATABASE_URL at an empty database")
+            sys.exit(1)
+        started = time.perf_counter()
+        generate(db, args)
+        print(f"✓ Corpus ready in {time.perf_counter() - started:.0f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark corpus")
+    parser.add_argument("--papers", type=int, default=1_000_000)
+    parser.add_argument("--votes", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--anonymous-voters", type=int, default=400_000,
+                        help="Distinct anonymous identifiers voting on papers")
+    parser.add_argument("--comments", type=int, default=2_000_000)
+    parser.add_argument("--comment-votes", type=int, default=3_000_000)
+    parser.add_argument("--max-thread", type=int, default=2_000, help="Most comments on one paper or post")
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--post-votes", type=int, default=500_000)
+    parser.add_argument("--post-comments", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=730, help="Spread publication dates over this many days")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
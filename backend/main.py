@@ -1,29 +1,48 @@
 import os
 import asyncio
 from datetime import datetime, timedelta
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
-import json
-from jose import JWTError, jwt
-from pydantic import BaseModel, EmailStr
-
-from database import get_db, init_db
-from models import Paper, Vote, Comment, User, CommentVote, Post, PostVote, PostComment
-
-app = FastAPI(title="arXiv News API")
-
-# Background task state
-last_scrape_time = None
+from jose import jwt
+from pydantic import BaseModel, EmailStr, Field
+
+import comment_tree
+import feed
+import passwords
+import posts
+import ranking
+import reconcile
+import search
+import sitemap
+import stats
+from cache import response_cache
+from rate_limit import RateLimitMiddleware
+from metrics import METRICS_ENABLED, METRICS_TOKEN, MetricsMiddleware, instrument_engine, metrics_registry, token_allowed
+from live_counts import STREAM_MAX_IDS, counts_broker, event_stream, parse_ids
+from database import SessionLocal, async_engine, engine, get_async_db, get_db, init_db, pool_stats
+from stats import stats_counters
+from serialization import FastJSONResponse, add_compression, dumps, loads
+from user_cache import UserSnapshot, user_cache
+from vote_buffer import VOTE_BUFFER_ENABLED, vote_buffer
+from models import Paper, Vote, Comment, User, CommentVote, Post, PostVote, PostComment, PostCommentVote, Author
+
+app = FastAPI(title="arXiv News API", default_response_class=FastJSONResponse)
 
 # JWT Settings
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Comment threads sent with the paper by /papers/{arxiv_id}/full (the rest via /comments)
+FULL_COMMENT_THREADS = int(os.getenv("FULL_COMMENT_THREADS", "50"))
+
 security = HTTPBearer()
 
 # CORS origins from environment variable or default to localhost
@@ -32,6 +51,9 @@ CORS_ORIGINS = os.getenv(
     "http://localhost:5173,http://localhost:3000"
 ).split(",")
 
+# Throttle writes and search per user/IP (inside CORS, so 429s still carry CORS headers)
+app.add_middleware(RateLimitMiddleware, secret_key=SECRET_KEY, algorithm=ALGORITHM)
+
 # CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -39,20 +61,48 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Retry-After"],
 )
 
+# Per-route latency, SQL and N+1 metrics for /metrics (outermost, so it times everything)
+if METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(async_engine)
+    app.add_middleware(MetricsMiddleware)
+
+# gzip/brotli for large bodies (feeds, search results, comment trees)
+add_compression(app)
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup():
     init_db()
     print("✓ Database initialized")
+    if stats_counters.ensure_initialized():
+        print("✓ Stats counters initialized")
     
     # Start background scraper AFTER app is healthy
     asyncio.create_task(delayed_auto_scraper())
+    asyncio.create_task(hot_score_refresher())
+    asyncio.create_task(counter_reconciler())
+
+    if VOTE_BUFFER_ENABLED:
+        asyncio.create_task(vote_buffer.run())
+
+    asyncio.create_task(counts_broker.run())
+    asyncio.create_task(stats_counters.run())
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Don't lose buffered vote counts on deploy/restart
+    flushed = vote_buffer.flush()
+    if flushed:
+        print(f"✓ Flushed buffered votes for {flushed} papers")
+    stats_counters.flush()
+    passwords.shutdown_pool()
 
 async def delayed_auto_scraper():
     """Wait for app to start, then run daily scraper"""
-    global last_scrape_time
     
     # Wait 30 seconds for app to be healthy first
     print("⏳ Waiting 30 seconds before starting scraper...")
@@ -69,8 +119,7 @@ async def delayed_auto_scraper():
             loop = asyncio.get_event_loop()
             with concurrent.futures.ThreadPoolExecutor() as pool:
                 await loop.run_in_executor(pool, scrape_latest_papers, 500)
-            
-            last_scrape_time = datetime.now()
+
             print(f"✓ Scraper completed successfully. Next run in 24 hours.")
             
         except Exception as e:
@@ -79,6 +128,63 @@ async def delayed_auto_scraper():
         # Wait 24 hours before next run
         await asyncio.sleep(24 * 60 * 60)
 
+async def hot_score_refresher():
+    """Periodically re-decay the hot scores of recent papers"""
+    interval = int(os.getenv("HOT_REFRESH_MINUTES", "10")) * 60
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            loop = asyncio.get_event_loop()
+            refreshed = await loop.run_in_executor(None, refresh_recent_hot_scores)
+            print(f"✓ Refreshed hot scores for {refreshed} papers")
+        except Exception as e:
+            print(f"❌ Error refreshing hot scores: {e}")
+
+def refresh_recent_hot_scores():
+    db = SessionLocal()
+    try:
+        refreshed = ranking.refresh_hot_scores(db)
+        response_cache.invalidate("papers")
+        return refreshed
+    finally:
+        db.close()
+
+async def counter_reconciler():
+    """Periodically repair drift in denormalized vote/comment/karma counts"""
+    interval = int(os.getenv("RECONCILE_INTERVAL_MINUTES", "60")) * 60
+    if interval <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            loop = asyncio.get_event_loop()
+            report = await loop.run_in_executor(None, reconcile_counts)
+            drifted = {name: result for name, result in report.items() if result["rows"]}
+            if drifted:
+                print(f"⚠️  Reconciled counter drift: {drifted}")
+            else:
+                print("✓ Counters reconciled, no drift")
+        except Exception as e:
+            print(f"❌ Error reconciling counters: {e}")
+
+def reconcile_counts():
+    # Buffered votes aren't in vote_count yet; write them first so they don't count as drift
+    vote_buffer.flush()
+    db = SessionLocal()
+    try:
+        report, fixed = reconcile.reconcile_counters(db)
+        if fixed["papers.vote_count"] or fixed["papers.comment_count"]:
+            response_cache.invalidate("papers")
+        if fixed["posts.vote_count"] or fixed["posts.comment_count"]:
+            response_cache.invalidate("posts")
+        if fixed["users.karma"]:
+            user_cache.invalidate(*fixed["users.karma"])
+        return report
+    finally:
+        db.close()
+
 # Authentication helper functions
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -90,37 +196,28 @@ def create_access_token(data: dict):
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
+) -> UserSnapshot:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
-    try:
-        print(f"Attempting to decode token: {token[:20]}...")
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"Decoded payload: {payload}")
-        user_id_str: str = payload.get("sub")
-        if user_id_str is None:
-            print("No 'sub' field in payload")
-            raise credentials_exception
-        user_id = int(user_id_str)
-        print(f"User ID from token: {user_id}")
-    except JWTError as e:
-        print(f"JWT decode error: {e}")
+    user_id = user_cache.user_id(credentials.credentials, SECRET_KEY, ALGORITHM)
+    if user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        print(f"No user found with ID: {user_id}")
-        raise credentials_exception
-    print(f"Found user: {user.username}")
-    return user
+    # The session only opens a connection if the snapshot isn't cached
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        user = db.get(User, user_id)
+        if user is None:
+            raise credentials_exception
+        snapshot = user_cache.set(user)
+    return snapshot
 
 def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[UserSnapshot]:
     if not credentials:
         return None
     try:
@@ -128,6 +225,24 @@ def get_optional_user(
     except HTTPException:
         return None
 
+async def get_optional_user_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[UserSnapshot]:
+    if not credentials:
+        return None
+    user_id = user_cache.user_id(credentials.credentials, SECRET_KEY, ALGORITHM)
+    if user_id is None:
+        return None
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = user_cache.set(user)
+    return snapshot
+
 # Pydantic models for API
 class PaperResponse(BaseModel):
     id: int
@@ -147,6 +262,70 @@ class PaperResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class PaperFeedResponse(BaseModel):
+    papers: List[PaperResponse]
+    next_cursor: Optional[str] = None
+
+def paper_to_dict(paper: Paper) -> dict:
+    """PaperResponse-shaped dict, built without a per-row Pydantic model"""
+    return {
+        "id": paper.id,
+        "arxiv_id": paper.arxiv_id,
+        "title": paper.title,
+        "authors": loads(paper.authors),
+        "abstract": paper.abstract,
+        "pdf_url": paper.pdf_url,
+        "arxiv_url": paper.arxiv_url,
+        "published": paper.published,
+        "categories": loads(paper.categories),
+        "primary_category": paper.primary_category,
+        "vote_count": paper.vote_count,
+        "comment_count": paper.comment_count,
+        "created_at": paper.created_at.isoformat()
+    }
+
+def paper_detail_to_dict(paper: Paper) -> dict:
+    """The paper page's fields: the feed's minus created_at, plus arXiv's comment/journal_ref/doi"""
+    return {
+        "id": paper.id,
+        "arxiv_id": paper.arxiv_id,
+        "title": paper.title,
+        "authors": loads(paper.authors),
+        "abstract": paper.abstract,
+        "pdf_url": paper.pdf_url,
+        "arxiv_url": paper.arxiv_url,
+        "published": paper.published,
+        "categories": loads(paper.categories),
+        "primary_category": paper.primary_category,
+        "vote_count": paper.vote_count,
+        "comment_count": paper.comment_count,
+        "comment": paper.comment,
+        "journal_ref": paper.journal_ref,
+        "doi": paper.doi
+    }
+
+def json_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def cached_response(lookup, request: Request) -> Optional[Response]:
+    """A 304 if the client already has this version, the cached body if we have it, else None"""
+    if not response_cache.enabled:
+        return None
+    if lookup.not_modified(request):
+        return Response(status_code=304, headers=lookup.headers)
+    body = await response_cache.get(lookup.key)
+    if body is not None:
+        return json_response(body, lookup.headers)
+    return None
+
+async def store_response(lookup, content) -> Response:
+    """Serialize a fresh response, cache it and send it with its validators"""
+    body = dumps(content)
+    if not response_cache.enabled:
+        return json_response(body)
+    await response_cache.set(lookup.key, body)
+    return json_response(body, lookup.headers)
+
 class CommentCreate(BaseModel):
     content: str
     parent_id: Optional[int] = None
@@ -212,58 +391,74 @@ def root():
 @app.get("/status")
 def get_status(db: Session = Depends(get_db)):
     """Get API and scraper status"""
-    global last_scrape_time
-
-    paper_count = db.query(Paper).count()
+    counters = stats_counters.read(db, [
+        stats.PAPERS, stats.VOTES, stats.COMMENTS, stats.POSTS, stats.POST_COMMENTS, stats.USERS,
+        stats.LAST_SCRAPE_AT, stats.LAST_SCRAPE_MS
+    ])
+    last_scrape_time = None
+    if counters[stats.LAST_SCRAPE_AT]:
+        last_scrape_time = datetime.fromtimestamp(counters[stats.LAST_SCRAPE_AT])
 
     return {
         "status": "running",
-        "total_papers": paper_count,
+        "total_papers": counters[stats.PAPERS],
+        "total_votes": counters[stats.VOTES],
+        "total_comments": counters[stats.COMMENTS],
+        "total_posts": counters[stats.POSTS],
+        "total_post_comments": counters[stats.POST_COMMENTS],
+        "total_users": counters[stats.USERS],
         "last_scrape": last_scrape_time.isoformat() if last_scrape_time else None,
+        "last_scrape_seconds": counters[stats.LAST_SCRAPE_MS] / 1000 if last_scrape_time else None,
         "next_scrape": (last_scrape_time + timedelta(hours=24)).isoformat() if last_scrape_time else None,
         "auto_scraper_enabled": True
     }
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))):
+    """Prometheus scrape endpoint (bearer METRICS_TOKEN)"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token_allowed(credentials.credentials if credentials else None):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    gauges = {
+        "db_pool_size": ("Connections the pool keeps open", "size"),
+        "db_pool_checked_in": ("Idle connections in the pool", "checked_in"),
+        "db_pool_checked_out": ("Connections checked out of the pool", "checked_out"),
+        "db_pool_overflow": ("Connections opened beyond the pool size", "overflow"),
+    }
+    pools = pool_stats()
+    body = metrics_registry.render({
+        metric: (help_text, [({"engine": name}, stats_[key]) for name, stats_ in pools.items() if key in stats_])
+        for metric, (help_text, key) in gauges.items()
+    })
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/stats/categories")
+def get_category_counts(db: Session = Depends(get_db)):
+    """Paper counts per category ('cs.LG') and per archive ('cs')"""
+    return {
+        "categories": stats_counters.read_prefix(db, stats.CATEGORY_PREFIX),
+        "archives": stats_counters.read_prefix(db, stats.ARCHIVE_PREFIX)
+    }
+
 @app.get("/sitemap.xml")
 def get_sitemap(db: Session = Depends(get_db)):
-    """Generate clean sitemap with only canonical URLs"""
-    from fastapi.responses import Response
-    from datetime import datetime
-
-    # Get all papers
-    papers = db.query(Paper).order_by(Paper.created_at.desc()).limit(10000).all()
-
-    xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-
-    # Homepage ONLY - no query params
-    xml += '  <url>\n'
-    xml += '    <loc>https://arxiv-news.com/</loc>\n'
-    xml += '    <changefreq>hourly</changefreq>\n'
-    xml += '    <priority>1.0</priority>\n'
-    xml += f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>\n'
-    xml += '  </url>\n'
-
-    # Show page
-    xml += '  <url>\n'
-    xml += '    <loc>https://arxiv-news.com/show</loc>\n'
-    xml += '    <changefreq>daily</changefreq>\n'
-    xml += '    <priority>0.8</priority>\n'
-    xml += f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>\n'
-    xml += '  </url>\n'
-
-    # Paper pages - CLEAN URLs ONLY
-    for paper in papers:
-        xml += '  <url>\n'
-        xml += f'    <loc>https://arxiv-news.com/paper/{paper.arxiv_id}</loc>\n'
-        xml += f'    <lastmod>{paper.created_at.strftime("%Y-%m-%d")}</lastmod>\n'
-        xml += '    <changefreq>weekly</changefreq>\n'
-        xml += '    <priority>0.7</priority>\n'
-        xml += '  </url>\n'
-
-    xml += '</urlset>'
-
-    return Response(content=xml, media_type="application/xml")
+    """Sitemap index pointing at the gzipped shards"""
+    # Read shard ranges now: the session is closed before the body streams
+    shards = list(sitemap.iter_paper_shards(db))
+    return StreamingResponse(sitemap.iter_sitemap_index(shards), media_type="application/xml")
+
+@app.get("/sitemap-{shard}.xml.gz")
+def get_sitemap_shard(shard: int, db: Session = Depends(get_db)):
+    """One gzipped sitemap shard, served from the on-disk cache"""
+    f = sitemap.open_shard(db, shard)
+    if f is None:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    return StreamingResponse(sitemap.iter_file(f), media_type="application/gzip")
 
 @app.get("/robots.txt")
 def get_robots():
@@ -292,14 +487,10 @@ def manual_scrape(max_results: int = 500, db: Session = Depends(get_db)):
         from scraper import scrape_latest_papers
         scrape_latest_papers(max_results=max_results)
 
-        global last_scrape_time
-        last_scrape_time = datetime.now()
-
-        paper_count = db.query(Paper).count()
         return {
             "status": "success",
             "message": f"Scrape completed",
-            "total_papers": paper_count
+            "total_papers": stats_counters.read(db, [stats.PAPERS])[stats.PAPERS]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scrape failed: {str(e)}")
@@ -352,11 +543,11 @@ def migrate_comments_table(db: Session = Depends(get_db)):
 
 # Auth routes
 @app.post("/auth/register", response_model=TokenResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.username == user_data.username).first():
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if (await db.execute(select(User.id).where(User.username == user_data.username))).first():
         raise HTTPException(status_code=400, detail="Username already taken")
 
-    if db.query(User).filter(User.email == user_data.email).first():
+    if (await db.execute(select(User.id).where(User.email == user_data.email))).first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
     if not user_data.username.isalnum() or len(user_data.username) < 3 or len(user_data.username) > 20:
@@ -365,11 +556,12 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=User.hash_password(user_data.password)
+        password_hash=await passwords.hash_password(user_data.password)
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    stats_counters.add(stats.USERS)
 
     access_token = create_access_token(data={"sub": str(user.id)})
 
@@ -387,12 +579,20 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     }
 
 @app.post("/auth/login", response_model=TokenResponse)
-def login(login_data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == login_data.email).first()
+async def login(login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.email == login_data.email))).scalars().first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    if not user or not user.verify_password(login_data.password):
+    valid, new_hash = await passwords.verify_password(login_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    # Stored hash uses an older BCRYPT_ROUNDS: upgrade it while we have the password
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     access_token = create_access_token(data={"sub": str(user.id)})
 
     return {
@@ -409,7 +609,7 @@ def login(login_data: UserLogin, db: Session = Depends(get_db)):
     }
 
 @app.get("/auth/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: UserSnapshot = Depends(get_current_user)):
     return UserResponse(
         id=current_user.id,
         username=current_user.username,
@@ -435,190 +635,122 @@ def get_user_profile(username: str, db: Session = Depends(get_db)):
 @app.patch("/users/me", response_model=UserResponse)
 def update_profile(
     update_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    # current_user is a cached snapshot; edit the real row
+    user = db.get(User, current_user.id)
+
     if update_data.bio is not None:
         if len(update_data.bio) > 160:
             raise HTTPException(status_code=400, detail="Bio must be 160 characters or less")
-        current_user.bio = update_data.bio
+        user.bio = update_data.bio
 
     db.commit()
-    db.refresh(current_user)
+    db.refresh(user)
+    user_cache.invalidate(user.id)
 
     return UserResponse(
-        id=current_user.id,
-        username=current_user.username,
-        email=current_user.email,
-        bio=current_user.bio,
-        karma=current_user.karma,
-        created_at=current_user.created_at.isoformat()
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        bio=user.bio,
+        karma=user.karma,
+        created_at=user.created_at.isoformat()
     )
 
-@app.get("/papers", response_model=List[PaperResponse])
-def get_papers(
-    skip: int = 0,
-    limit: int = 15000,
-    sort: str = "votes",  # votes, recent, comments
-    db: Session = Depends(get_db)
+@app.get("/papers", response_model=PaperFeedResponse)
+async def get_papers(
+    request: Request,
+    sort: str = "hot",  # hot/votes, new/recent, discussed/comments
+    cat: Optional[str] = None,
+    window: str = "all",  # 24h, 7d, week, month, all...
+    cursor: Optional[str] = None,
+    limit: int = Query(feed.DEFAULT_PAGE_SIZE, ge=1, le=feed.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get papers sorted by votes, recency, or comments (newest 5000 only)"""
-    
-    # Only get papers from the most recent 5000 by publication date
-    recent_papers_subquery = (
-        db.query(Paper.id)
-        .order_by(Paper.published.desc())
-        .limit(15000)
-        .subquery()
-    )
+    """Get one page of the paper feed, filtered by category and time window"""
+    lookup = await response_cache.lookup("papers", request)
+    cached = await cached_response(lookup, request)
+    if cached is not None:
+        return cached
 
-    query = db.query(Paper).filter(Paper.id.in_(select(recent_papers_subquery.c.id)))
-    
-    if sort == "votes":
-        query = query.order_by(Paper.vote_count.desc())
-    elif sort == "recent":
-        query = query.order_by(Paper.published.desc())
-    elif sort == "comments":
-        query = query.order_by(Paper.comment_count.desc())
-    
-    papers = query.offset(skip).limit(limit).all()
-    
-    # Parse JSON strings back to lists
-    result = []
-    for paper in papers:
-        paper_dict = {
-            "id": paper.id,
-            "arxiv_id": paper.arxiv_id,
-            "title": paper.title,
-            "authors": json.loads(paper.authors),
-            "abstract": paper.abstract,
-            "pdf_url": paper.pdf_url,
-            "arxiv_url": paper.arxiv_url,
-            "published": paper.published,
-            "categories": json.loads(paper.categories),
-            "primary_category": paper.primary_category,
-            "vote_count": paper.vote_count,
-            "comment_count": paper.comment_count,
-            "created_at": paper.created_at.isoformat()
-        }
-        result.append(PaperResponse(**paper_dict))
-    
-    return result
+    try:
+        query = feed.build_feed_query(sort=sort, category=cat, window=window, cursor=cursor, limit=limit)
+    except feed.FeedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    papers = (await db.execute(query)).scalars().all()
+    page, next_cursor = feed.paginate(papers, sort, limit)
+
+    return await store_response(lookup, {
+        "papers": [paper_to_dict(paper) for paper in page],
+        "next_cursor": next_cursor
+    })
 
 @app.get("/papers/{arxiv_id}")
-def get_paper(arxiv_id: str, db: Session = Depends(get_db)):
+async def get_paper(arxiv_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get single paper by arXiv ID"""
-    paper = db.query(Paper).filter(Paper.arxiv_id == arxiv_id).first()
+    lookup = await response_cache.lookup(f"paper:{arxiv_id}", request)
+    cached = await cached_response(lookup, request)
+    if cached is not None:
+        return cached
+
+    paper = (await db.execute(select(Paper).where(Paper.arxiv_id == arxiv_id))).scalars().first()
     if not paper:
         raise HTTPException(status_code=404, detail="Paper not found")
     
-    return {
-        "id": paper.id,
-        "arxiv_id": paper.arxiv_id,
-        "title": paper.title,
-        "authors": json.loads(paper.authors),
-        "abstract": paper.abstract,
-        "pdf_url": paper.pdf_url,
-        "arxiv_url": paper.arxiv_url,
-        "published": paper.published,
-        "categories": json.loads(paper.categories),
-        "primary_category": paper.primary_category,
-        "vote_count": paper.vote_count,
-        "comment_count": paper.comment_count,
-        "comment": paper.comment,
-        "journal_ref": paper.journal_ref,
-        "doi": paper.doi
-    }
+    return await store_response(lookup, paper_detail_to_dict(paper))
 
 @app.get("/search", response_model=List[PaperResponse])
-def search_papers(
+async def search_papers(
     q: str,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Search all papers (across all time) by title, abstract, authors, etc."""
+    """Search all papers (across all time) by title, abstract and authors"""
     if not q or len(q.strip()) == 0:
         return []
 
-    search_term = q.lower().strip()
+    papers = await search.search_papers_async(db, q, limit)
 
-    # Get all papers
-    all_papers = db.query(Paper).all()
+    return json_response(dumps([paper_to_dict(paper) for paper in papers]))
 
-    # Client-side filtering to search across multiple fields
-    matching_papers = []
-    for paper in all_papers:
-        try:
-            # Search in title
-            if search_term in paper.title.lower():
-                matching_papers.append(paper)
-                continue
-
-            # Search in abstract
-            if paper.abstract and search_term in paper.abstract.lower():
-                matching_papers.append(paper)
-                continue
-
-            # Search in authors
-            if paper.authors:
-                try:
-                    authors = json.loads(paper.authors)
-                    if isinstance(authors, list):
-                        for author in authors:
-                            if search_term in author.lower():
-                                matching_papers.append(paper)
-                                break
-                    elif isinstance(authors, str):
-                        if search_term in authors.lower():
-                            matching_papers.append(paper)
-                except:
-                    pass
-        except Exception as e:
-            print(f"Error searching paper {paper.arxiv_id}: {e}")
-            continue
-
-    # Sort by relevance (title matches first, then vote count)
-    def relevance_score(paper):
-        score = 0
-        if search_term in paper.title.lower():
-            score += 100  # Title match gets highest priority
-        if paper.abstract and search_term in paper.abstract.lower():
-            score += 50   # Abstract match gets lower priority
-        score += paper.vote_count  # Then sort by votes
-        return score
-
-    matching_papers.sort(key=relevance_score, reverse=True)
-
-    # Limit results
-    matching_papers = matching_papers[:limit]
-
-    # Convert to response format
-    result = []
-    for paper in matching_papers:
-        paper_dict = {
-            "id": paper.id,
-            "arxiv_id": paper.arxiv_id,
-            "title": paper.title,
-            "authors": json.loads(paper.authors),
-            "abstract": paper.abstract,
-            "pdf_url": paper.pdf_url,
-            "arxiv_url": paper.arxiv_url,
-            "published": paper.published,
-            "categories": json.loads(paper.categories),
-            "primary_category": paper.primary_category,
-            "vote_count": paper.vote_count,
-            "comment_count": paper.comment_count,
-            "created_at": paper.created_at.isoformat()
-        }
-        result.append(PaperResponse(**paper_dict))
+@app.get("/authors/{name}/papers")
+async def get_author_papers(
+    name: str,
+    sort: str = "new",
+    window: str = "all",
+    cursor: Optional[str] = None,
+    limit: int = Query(feed.DEFAULT_PAGE_SIZE, ge=1, le=feed.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get papers by an author (name matching ignores case, accents and punctuation)"""
+    author = (await db.execute(
+        select(Author).where(Author.normalized_name == Author.normalize(name))
+    )).scalars().first()
+    if not author:
+        raise HTTPException(status_code=404, detail="Author not found")
 
-    return result
+    try:
+        query = feed.build_feed_query(sort=sort, window=window, cursor=cursor, limit=limit, author_id=author.id)
+    except feed.FeedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    papers = (await db.execute(query)).scalars().all()
+    page, next_cursor = feed.paginate(papers, sort, limit)
+
+    return json_response(dumps({
+        "author": author.name,
+        "papers": [paper_to_dict(paper) for paper in page],
+        "next_cursor": next_cursor
+    }))
 
 @app.post("/papers/{arxiv_id}/vote")
 def vote_paper(
     arxiv_id: str,
     user_identifier: str,  # Can be anonymous or user_id
-    current_user: Optional[User] = Depends(get_optional_user),
+    current_user: Optional[UserSnapshot] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
     """Upvote a paper (works for both logged in and anonymous users)"""
@@ -629,6 +761,9 @@ def vote_paper(
     # Use user_id if logged in, otherwise use anonymous identifier
     vote_identifier = str(current_user.id) if current_user else user_identifier
 
+    if VOTE_BUFFER_ENABLED:
+        return buffered_vote(db, paper, vote_identifier)
+
     # Check if already voted
     existing_vote = db.query(Vote).filter(
         Vote.paper_id == paper.id,
@@ -645,64 +780,176 @@ def vote_paper(
         db.add(vote)
         paper.vote_count += 1
 
+    ranking.update_hot_score(paper)
     db.commit()
+    stats_counters.add(stats.VOTES, -1 if existing_vote else 1)
+    response_cache.invalidate("papers", f"paper:{arxiv_id}")
+    counts_broker.publish("papers", paper.id, vote_count=paper.vote_count)
     return {"vote_count": paper.vote_count, "user_voted": not existing_vote}
 
+def buffered_vote(db: Session, paper: Paper, vote_identifier: str) -> dict:
+    """Toggle the vote row now and leave the vote_count update to the write-behind buffer"""
+    paper_id, arxiv_id = paper.id, paper.arxiv_id
+
+    try:
+        db.add(Vote(paper_id=paper_id, user_identifier=vote_identifier))
+        db.commit()
+        user_voted, delta = True, 1
+    except IntegrityError:
+        # The unique constraint says this user already voted: unvote
+        db.rollback()
+        removed = db.query(Vote).filter(
+            Vote.paper_id == paper_id,
+            Vote.user_identifier == vote_identifier
+        ).delete(synchronize_session=False)
+        db.commit()
+        user_voted, delta = False, -removed
+
+    vote_buffer.add(paper_id, delta)
+    stats_counters.add(stats.VOTES, delta)
+    # The feed catches up when the buffer flushes, but /full carries this voter's user_voted
+    response_cache.invalidate(f"paper:{arxiv_id}")
+    vote_count = vote_buffer.vote_count(db, paper_id)
+    counts_broker.publish("papers", paper_id, vote_count=vote_count)
+    return {"vote_count": vote_count, "user_voted": user_voted}
+
+# Most ids /votes/status resolves per entity type in one request
+MAX_VOTE_STATUS_IDS = 500
+
+class VoteStatusRequest(BaseModel):
+    paper_ids: List[int] = Field(default_factory=list, max_length=MAX_VOTE_STATUS_IDS)
+    comment_ids: List[int] = Field(default_factory=list, max_length=MAX_VOTE_STATUS_IDS)
+    post_ids: List[int] = Field(default_factory=list, max_length=MAX_VOTE_STATUS_IDS)
+    post_comment_ids: List[int] = Field(default_factory=list, max_length=MAX_VOTE_STATUS_IDS)
+
+
+@app.post("/votes/status")
+async def get_vote_status(
+    body: VoteStatusRequest,
+    current_user: Optional[UserSnapshot] = Depends(get_optional_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Which of the given papers, comments, posts and post comments the caller has upvoted"""
+    queries = {}
+
+    # Anonymous paper votes share one identifier, so only a logged-in user's
+    # votes are theirs; anonymous clients keep their own record
+    if current_user:
+        if body.paper_ids:
+            queries["paper_ids"] = select(Vote.paper_id).where(
+                Vote.user_identifier == str(current_user.id),
+                Vote.paper_id.in_(body.paper_ids)
+            )
+        if body.comment_ids:
+            queries["comment_ids"] = comment_tree.user_votes_query(current_user.id, body.comment_ids)
+        if body.post_ids:
+            queries["post_ids"] = select(PostVote.post_id).where(
+                PostVote.user_id == current_user.id,
+                PostVote.post_id.in_(body.post_ids)
+            )
+        if body.post_comment_ids:
+            queries["post_comment_ids"] = posts.user_votes_query(current_user.id, body.post_comment_ids)
+
+    # One IN query per entity type that was asked about
+    result = {"paper_ids": [], "comment_ids": [], "post_ids": [], "post_comment_ids": []}
+    for key, query in queries.items():
+        result[key] = sorted(set((await db.execute(query)).scalars()))
+    return result
+
+@app.get("/stream/counts")
+async def stream_counts(request: Request, papers: str = "", posts: str = ""):
+    """Server-Sent Events with live vote/comment counts for the given paper and post ids"""
+    try:
+        ids = {"papers": parse_ids(papers), "posts": parse_ids(posts)}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ids must be comma-separated integers")
+    if any(len(item_ids) > STREAM_MAX_IDS for item_ids in ids.values()):
+        raise HTTPException(status_code=400, detail=f"At most {STREAM_MAX_IDS} ids per kind")
+
+    subscription = counts_broker.subscribe(ids)
+    return StreamingResponse(
+        event_stream(request, subscription, counts_broker),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/papers/{arxiv_id}/comments", response_model=List[CommentResponse])
-def get_comments(
+async def get_comments(
     arxiv_id: str,
-    current_user: Optional[User] = Depends(get_optional_user),
-    db: Session = Depends(get_db)
+    max_depth: Optional[int] = Query(None, ge=1),
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: Optional[UserSnapshot] = Depends(get_optional_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get comments for a paper"""
-    paper = db.query(Paper).filter(Paper.arxiv_id == arxiv_id).first()
-    if not paper:
+    """Get the comment tree for a paper (newest `limit` threads, `max_depth` levels deep)"""
+    paper_id = (await db.execute(select(Paper.id).where(Paper.arxiv_id == arxiv_id))).scalar()
+    if paper_id is None:
         raise HTTPException(status_code=404, detail="Paper not found")
 
-    # Only get top-level comments (parent_id is null)
-    comments = db.query(Comment).filter(
-        Comment.paper_id == paper.id,
-        Comment.parent_id == None
-    ).order_by(Comment.created_at.desc()).all()
+    # All comments and their authors in one recursive query
+    rows = (await db.execute(comment_tree.comment_tree_query(paper_id, max_depth, limit))).all()
 
-    # Get user's comment votes if logged in
+    # Get user's votes on these comments if logged in
     user_votes = set()
-    if current_user:
-        votes = db.query(CommentVote.comment_id).filter(CommentVote.user_id == current_user.id).all()
-        user_votes = {v.comment_id for v in votes}
-
-    def build_comment_tree(comment):
-        """Recursively build comment tree with replies"""
-        user = db.query(User).filter(User.id == comment.user_id).first()
-
-        # Get replies
-        replies = db.query(Comment).filter(Comment.parent_id == comment.id).order_by(Comment.created_at.asc()).all()
+    if current_user and rows:
+        comment_ids = [comment.id for comment, _ in rows]
+        user_votes = set((await db.execute(comment_tree.user_votes_query(current_user.id, comment_ids))).scalars())
 
-        # Debug logging
-        print(f"Comment {comment.id}: Found {len(replies)} replies")
-        if len(replies) > 0:
-            print(f"  Reply IDs: {[r.id for r in replies]}")
+    return comment_tree.build_comment_tree(rows, user_votes)
 
-        return {
-            "id": comment.id,
-            "user_id": comment.user_id,
-            "username": user.username if user else "deleted",
-            "content": comment.content,
-            "vote_count": comment.vote_count,
-            "created_at": comment.created_at.isoformat(),
-            "user_voted": comment.id in user_votes,
-            "replies": [build_comment_tree(reply) for reply in replies]
-        }
+@app.get("/papers/{arxiv_id}/full")
+async def get_paper_full(
+    arxiv_id: str,
+    request: Request,
+    limit: int = Query(FULL_COMMENT_THREADS, ge=1, le=500),
+    max_depth: Optional[int] = Query(None, ge=1),
+    current_user: Optional[UserSnapshot] = Depends(get_optional_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Paper, its newest `limit` comment threads and the caller's votes, in at most three queries"""
+    # One cached body per logged-in user, one shared by everyone anonymous
+    variant = f"user:{current_user.id}" if current_user else None
+    lookup = await response_cache.lookup(f"paper:{arxiv_id}", request, variant)
+    cached = await cached_response(lookup, request)
+    if cached is not None:
+        return cached
+
+    # The paper and whether the caller has voted on it. Anonymous votes share one
+    # identifier, so for anonymous callers that's left to the client (user_voted: null)
+    query = select(Paper).where(Paper.arxiv_id == arxiv_id)
+    if current_user:
+        query = query.add_columns(
+            select(Vote.id)
+            .where(Vote.paper_id == Paper.id, Vote.user_identifier == str(current_user.id))
+            .exists()
+        )
+    row = (await db.execute(query)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    paper = row[0]
 
-    result = [build_comment_tree(c) for c in comments]
+    # One extra thread tells us whether there are more than `limit`
+    rows = (await db.execute(comment_tree.comment_tree_query(paper.id, max_depth, limit + 1))).all()
 
-    return result
+    user_votes = set()
+    if current_user and rows:
+        comment_ids = [comment.id for comment, _ in rows]
+        user_votes = set((await db.execute(comment_tree.user_votes_query(current_user.id, comment_ids))).scalars())
+
+    comments = comment_tree.build_comment_tree(rows, user_votes)
+    return await store_response(lookup, {
+        "paper": paper_detail_to_dict(paper),
+        "comments": comments[:limit],
+        "has_more_comments": len(comments) > limit,
+        "user_voted": bool(row[1]) if current_user else None
+    })
 
 @app.post("/papers/{arxiv_id}/comments")
 def add_comment(
     arxiv_id: str,
     comment_data: CommentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Add a comment to a paper"""
@@ -724,14 +971,18 @@ def add_comment(
     )
     db.add(comment)
     paper.comment_count += 1
+    ranking.update_hot_score(paper)
     db.commit()
+    stats_counters.add(stats.COMMENTS)
+    response_cache.invalidate("papers", f"paper:{arxiv_id}")
+    counts_broker.publish("papers", paper.id, comment_count=paper.comment_count)
 
     return {"message": "Comment added", "id": comment.id}
 
 @app.post("/comments/{comment_id}/vote")
 def vote_comment(
     comment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     comment = db.query(Comment).filter(Comment.id == comment_id).first()
@@ -760,12 +1011,16 @@ def vote_comment(
             commenter.karma += 1
 
     db.commit()
+    user_cache.invalidate(comment.user_id)
+    # The paper page (/papers/{arxiv_id}/full) shows comment vote counts
+    arxiv_id = db.execute(select(Paper.arxiv_id).where(Paper.id == comment.paper_id)).scalar()
+    response_cache.invalidate(f"paper:{arxiv_id}")
     return {"vote_count": comment.vote_count, "user_voted": not existing_vote}
 
 @app.delete("/comments/{comment_id}")
 def delete_comment(
     comment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a comment (only by the comment author)"""
@@ -781,10 +1036,15 @@ def delete_comment(
     paper = db.query(Paper).filter(Paper.id == comment.paper_id).first()
     if paper:
         paper.comment_count -= 1
+        ranking.update_hot_score(paper)
 
     # Delete the comment
     db.delete(comment)
     db.commit()
+    stats_counters.add(stats.COMMENTS, -1)
+    if paper:
+        response_cache.invalidate("papers", f"paper:{paper.arxiv_id}")
+        counts_broker.publish("papers", paper.id, comment_count=paper.comment_count)
 
     return {"message": "Comment deleted successfully"}
 
@@ -797,41 +1057,27 @@ class PostCreate(BaseModel):
 
 
 @app.get("/posts")
-def get_posts(
+async def get_posts(
+    request: Request,
     sort: str = "hot",
     limit: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Post)
-
-    if sort == "new":
-        query = query.order_by(Post.created_at.desc())
-    else:  # hot
-        query = query.order_by(Post.vote_count.desc(), Post.created_at.desc())
-
-    posts = query.limit(limit).all()
-
-    result = []
-    for post in posts:
-        result.append({
-            "id": post.id,
-            "title": post.title,
-            "url": post.url,
-            "text": post.text,
-            "vote_count": post.vote_count,
-            "comment_count": post.comment_count,
-            "created_at": post.created_at.isoformat(),
-            "username": post.user.username,
-            "user_id": post.user_id
-        })
+    lookup = await response_cache.lookup("posts", request)
+    cached = await cached_response(lookup, request)
+    if cached is not None:
+        return cached
 
-    return result
+    # Posts and their authors' usernames in one query
+    rows = (await db.execute(posts.posts_query(sort, limit))).all()
+
+    return await store_response(lookup, [posts.post_to_dict(row) for row in rows])
 
 
 @app.post("/posts")
 def create_post(
     post_data: PostCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     # Validate that at least url or text is provided
@@ -848,6 +1094,8 @@ def create_post(
     db.add(post)
     db.commit()
     db.refresh(post)
+    stats_counters.add(stats.POSTS)
+    response_cache.invalidate("posts")
 
     return {
         "id": post.id,
@@ -863,28 +1111,18 @@ def create_post(
 
 
 @app.get("/posts/{post_id}")
-def get_post(post_id: int, db: Session = Depends(get_db)):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
+async def get_post(post_id: int, db: AsyncSession = Depends(get_async_db)):
+    row = (await db.execute(posts.post_query(post_id))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    return {
-        "id": post.id,
-        "title": post.title,
-        "url": post.url,
-        "text": post.text,
-        "vote_count": post.vote_count,
-        "comment_count": post.comment_count,
-        "created_at": post.created_at.isoformat(),
-        "username": post.user.username,
-        "user_id": post.user_id
-    }
+    return posts.post_to_dict(row)
 
 
 @app.post("/posts/{post_id}/vote")
 def vote_post(
     post_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     post = db.query(Post).filter(Post.id == post_id).first()
@@ -915,6 +1153,9 @@ def vote_post(
             poster.karma += 1
 
     db.commit()
+    user_cache.invalidate(post.user_id)
+    response_cache.invalidate("posts")
+    counts_broker.publish("posts", post.id, vote_count=post.vote_count)
     return {"vote_count": post.vote_count, "user_voted": not existing_vote}
 
 
@@ -924,37 +1165,40 @@ class PostCommentCreate(BaseModel):
 
 
 @app.get("/posts/{post_id}/comments")
-def get_post_comments(post_id: int, db: Session = Depends(get_db)):
-    # Get current user if logged in
-    token = None
+async def get_post_comments(
+    post_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(posts.DEFAULT_COMMENT_PAGE_SIZE, ge=1, le=posts.MAX_COMMENT_PAGE_SIZE),
+    current_user: Optional[UserSnapshot] = Depends(get_optional_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get one page of a post's comments, newest first"""
     try:
-        from fastapi import Request
-        # This is a simplified check - in production you'd use proper dependency injection
-        pass
-    except:
-        pass
-
-    comments = db.query(PostComment).filter(PostComment.post_id == post_id).order_by(PostComment.created_at.desc()).all()
-
-    result = []
-    for comment in comments:
-        result.append({
-            "id": comment.id,
-            "content": comment.content,
-            "vote_count": comment.vote_count,
-            "created_at": comment.created_at.isoformat(),
-            "username": comment.user.username,
-            "user_id": comment.user_id
-        })
+        query = posts.post_comments_query(post_id, cursor, limit)
+    except feed.FeedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return result
+    # Comments and their authors' usernames in one query
+    rows = (await db.execute(query)).all()
+    page, next_cursor = posts.paginate_comments(rows, limit)
+
+    # Which of this page's comments the user has upvoted, in one query
+    user_votes = set()
+    if current_user and page:
+        comment_ids = [row.id for row in page]
+        user_votes = set((await db.execute(posts.user_votes_query(current_user.id, comment_ids))).scalars())
+
+    return {
+        "comments": [posts.post_comment_to_dict(row, user_votes) for row in page],
+        "next_cursor": next_cursor
+    }
 
 
 @app.post("/posts/{post_id}/comments")
 def add_post_comment(
     post_id: int,
     comment_data: PostCommentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     post = db.query(Post).filter(Post.id == post_id).first()
@@ -971,6 +1215,9 @@ def add_post_comment(
     post.comment_count += 1
     db.commit()
     db.refresh(comment)
+    stats_counters.add(stats.POST_COMMENTS)
+    response_cache.invalidate("posts")
+    counts_broker.publish("posts", post_id, comment_count=post.comment_count)
 
     return {
         "id": comment.id,
@@ -980,3 +1227,39 @@ def add_post_comment(
         "username": current_user.username,
         "user_id": current_user.id
     }
+
+
+@app.post("/post-comments/{comment_id}/vote")
+def vote_post_comment(
+    comment_id: int,
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    comment = db.query(PostComment).filter(PostComment.id == comment_id).first()
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    existing_vote = db.query(PostCommentVote).filter(
+        PostCommentVote.comment_id == comment_id,
+        PostCommentVote.user_id == current_user.id
+    ).first()
+
+    if existing_vote:
+        db.delete(existing_vote)
+        comment.vote_count -= 1
+
+        commenter = db.query(User).filter(User.id == comment.user_id).first()
+        if commenter:
+            commenter.karma -= 1
+    else:
+        vote = PostCommentVote(comment_id=comment_id, user_id=current_user.id)
+        db.add(vote)
+        comment.vote_count += 1
+
+        commenter = db.query(User).filter(User.id == comment.user_id).first()
+        if commenter:
+            commenter.karma += 1
+
+    db.commit()
+    user_cache.invalidate(comment.user_id)
+    return {"vote_count": comment.vote_count, "user_voted": not existing_vote}
@@ -0,0 +1,244 @@
+"""
+Per-route request metrics in Prometheus text format
+
+An ASGI middleware times every request and counts its response bytes, and
+SQLAlchemy cursor hooks on both engines add each statement's count, time and
+rows to the request that ran it (found through a context variable, which the
+threadpool that runs sync routes inherits). Everything is aggregated per
+(method, route template), so label cardinality stays at the number of routes.
+A request that runs more than METRICS_QUERY_THRESHOLD statements is counted
+and logged as an N+1 suspect. GET /metrics renders it all for a scraper that
+sends METRICS_TOKEN as a bearer token, and isn't served at all without one.
+
+Rows are what the driver reports as cursor.rowcount, so they're only counted
+(and db_rows_total only exported) on Postgres: SQLite reports -1 for SELECTs.
+"""
+import contextvars
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# More statements than this in one request flags it as an N+1 suspect
+METRICS_QUERY_THRESHOLD = int(os.getenv("METRICS_QUERY_THRESHOLD", "20"))
+# Bearer token for GET /metrics; unset keeps the endpoint off the public API
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Drivers whose cursor.rowcount includes rows returned by a SELECT
+ROW_COUNT_DIALECTS = ("postgresql",)
+
+UNMATCHED_ROUTE = "unmatched"
+
+_current_request = contextvars.ContextVar("metrics_request", default=None)
+
+
+class RequestStats:
+    """SQL work done on behalf of one request"""
+
+    __slots__ = ("queries", "sql_seconds", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.statuses = defaultdict(int)
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.response_bytes = 0
+        self.n_plus_one = 0
+
+
+class MetricsRegistry:
+    def __init__(self, query_threshold: int = METRICS_QUERY_THRESHOLD):
+        self.query_threshold = query_threshold
+        self.routes = defaultdict(RouteMetrics)  # (method, route) -> RouteMetrics
+        self.counts_rows = False  # set once an engine in ROW_COUNT_DIALECTS is instrumented
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status: int, seconds: float, response_bytes: int, sql: RequestStats):
+        suspect = sql.queries > self.query_threshold
+        with self._lock:
+            metrics = self.routes[(method, route)]
+            metrics.latency.observe(seconds)
+            metrics.queries.observe(sql.queries)
+            metrics.statuses[status] += 1
+            metrics.sql_seconds += sql.sql_seconds
+            metrics.rows += sql.rows
+            metrics.response_bytes += response_bytes
+            if suspect:
+                metrics.n_plus_one += 1
+        if suspect:
+            print(f"⚠️  N+1 suspect: {method} {route} ran {sql.queries} queries "
+                  f"({sql.sql_seconds * 1000:.0f} ms of SQL)")
+
+    def render(self, extra_gauges: dict = None) -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            routes = sorted(self.routes.items())
+            lines = []
+
+            def header(name, kind, help_text):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            def histogram(name, help_text, attribute):
+                header(name, "histogram", help_text)
+                for (method, route), metrics in routes:
+                    labels = f'method="{method}",route="{escape(route)}"'
+                    hist = getattr(metrics, attribute)
+                    for bound, count in hist.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {count}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                    lines.append(f"{name}_sum{{{labels}}} {hist.sum:g}")
+                    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+            def counter(name, help_text, attribute):
+                header(name, "counter", help_text)
+                for (method, route), metrics in routes:
+                    labels = f'method="{method}",route="{escape(route)}"'
+                    lines.append(f"{name}{{{labels}}} {getattr(metrics, attribute):g}")
+
+            histogram("http_request_duration_seconds", "Request latency", "latency")
+            header("http_requests_total", "counter", "Requests by status code")
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(f'http_requests_total{{method="{method}",route="{escape(route)}",'
+                                 f'status="{status}"}} {count}')
+            counter("http_response_bytes_total", "Response body bytes sent", "response_bytes")
+            histogram("db_queries_per_request", "SQL statements run per request", "queries")
+            counter("db_query_seconds_total", "Time spent executing SQL", "sql_seconds")
+            if self.counts_rows:
+                counter("db_rows_total", "Rows returned or changed (cursor.rowcount, Postgres only)", "rows")
+            counter("db_n_plus_one_suspects_total",
+                    f"Requests running more than {self.query_threshold} SQL statements", "n_plus_one")
+
+        for name, (help_text, samples) in (extra_gauges or {}).items():
+            header(name, "gauge", help_text)
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{escape(str(val))}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+
+
+def token_allowed(token: str) -> bool:
+    """Whether a bearer token may read /metrics (never, if METRICS_TOKEN is unset)"""
+    if not METRICS_TOKEN or token is None:
+        return False
+    return secrets.compare_digest(token.encode(), METRICS_TOKEN.encode())
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def route_label(scope) -> str:
+    """The matched route's template ('/papers/{arxiv_id}'), never the raw path"""
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: "MetricsRegistry" = None):
+        self.app = app
+        self.registry = registry or metrics_registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        sql = RequestStats()
+        token = _current_request.set(sql)
+        start = time.perf_counter()
+        status = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            self.registry.record(
+                scope["method"], route_label(scope), status,
+                time.perf_counter() - start, response_bytes, sql
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        context.metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sql = _current_request.get()
+    if sql is None:
+        return
+    start = getattr(context, "metrics_start", None)
+    if start is None:
+        return
+    sql.queries += 1
+    sql.sql_seconds += time.perf_counter() - start
+    if conn.dialect.name in ROW_COUNT_DIALECTS and cursor.rowcount > 0:
+        sql.rows += cursor.rowcount
+
+
+def instrument_engine(engine):
+    """Attribute an engine's statements to the request running them"""
+    engine = getattr(engine, "sync_engine", engine)  # AsyncEngine
+    if engine.dialect.name in ROW_COUNT_DIALECTS:
+        metrics_registry.counts_rows = True
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+metrics_registry = MetricsRegistry()
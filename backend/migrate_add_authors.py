@@ -0,0 +1,66 @@
+"""
+Migration script to backfill the authors / paper_authors tables from papers.authors
+Run this once after deploying; it is safe to re-run (papers that already have
+author rows are skipped)
+"""
+import json
+
+from sqlalchemy import select
+
+from authors import author_links
+from database import SessionLocal, init_db
+from models import Paper, PaperAuthor
+
+BATCH_SIZE = 1000
+
+
+def migrate():
+    # Creates the authors and paper_authors tables if they don't exist
+    init_db()
+    db = SessionLocal()
+
+    try:
+        known_authors = {}
+        last_id = 0
+        linked = 0
+        while True:
+            papers = db.execute(
+                select(Paper)
+                .where(Paper.id > last_id)
+                .order_by(Paper.id)
+                .limit(BATCH_SIZE)
+            ).scalars().all()
+            if not papers:
+                break
+
+            ids = [paper.id for paper in papers]
+            done = set(db.execute(
+                select(PaperAuthor.paper_id).where(PaperAuthor.paper_id.in_(ids)).distinct()
+            ).scalars())
+
+            for paper in papers:
+                if paper.id not in done:
+                    paper.author_links = author_links(db, json.loads(paper.authors), known_authors)
+                    linked += 1
+            db.commit()
+
+            # Keep the identity map (and memory) bounded between batches
+            db.expunge_all()
+            known_authors = {}
+
+            last_id = ids[-1]
+            print(f"   💾 Backfilled papers up to id {last_id} ({linked} papers linked)")
+
+        print(f"✓ Backfill complete: {linked} papers linked to their authors")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,24 @@
+"""
+Migration script to add the keyset pagination indexes used by the paper feed
+Run this once to update an existing database (new databases get them from init_db)
+"""
+from sqlalchemy import inspect
+
+from database import engine
+from models import Paper
+
+
+def migrate():
+    columns = {column["name"] for column in inspect(engine).get_columns("papers")}
+    for index in Paper.__table__.indexes:
+        missing = [column.name for column in index.columns if column.name not in columns]
+        if missing:
+            print(f"⚠️ Skipping index {index.name}: run the migration that adds {', '.join(missing)} first")
+            continue
+        print(f"Creating index {index.name} (if missing)...")
+        index.create(bind=engine, checkfirst=True)
+    print("✓ Feed indexes are in place!")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,44 @@
+"""
+Migration script to add the hot_score ranking column to the papers table
+Run this once to update an existing database, then the API keeps scores fresh
+Requires the published_at column: run migrate_add_published_at.py first
+"""
+from sqlalchemy import text, inspect
+
+from database import SessionLocal, engine
+from models import Paper
+from ranking import refresh_hot_scores
+
+
+def migrate():
+    columns = [column["name"] for column in inspect(engine).get_columns("papers")]
+
+    if "published_at" not in columns:
+        print("❌ Column 'published_at' is missing; run migrate_add_published_at.py first.")
+        return
+
+    if "hot_score" in columns:
+        print("✓ Column 'hot_score' already exists.")
+    else:
+        print("Adding hot_score column to papers table...")
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE papers ADD COLUMN hot_score FLOAT DEFAULT 0"))
+        print("✓ Successfully added hot_score column!")
+
+    for index in Paper.__table__.indexes:
+        if index.name == "ix_papers_hot_score_id":
+            print("Creating index ix_papers_hot_score_id (if missing)...")
+            index.create(bind=engine, checkfirst=True)
+
+    # Score every paper once; the API's refresher only re-decays recent ones
+    print("Backfilling hot scores...")
+    db = SessionLocal()
+    try:
+        updated = refresh_hot_scores(db, window_days=None)
+        print(f"✓ Scored {updated} papers")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,66 @@
+"""
+Migration script to backfill the paper_categories table from papers.categories
+Run this once after deploying; it is safe to re-run (papers that already have
+rows are skipped)
+"""
+import json
+
+from sqlalchemy import select, insert
+
+from database import SessionLocal, init_db
+from models import Paper, PaperCategory
+
+BATCH_SIZE = 1000
+
+
+def migrate():
+    # Creates the paper_categories table and its indexes if they don't exist
+    init_db()
+    db = SessionLocal()
+
+    try:
+        last_id = 0
+        added = 0
+        while True:
+            papers = db.execute(
+                select(Paper.id, Paper.categories)
+                .where(Paper.id > last_id)
+                .order_by(Paper.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not papers:
+                break
+
+            ids = [paper.id for paper in papers]
+            done = set(db.execute(
+                select(PaperCategory.paper_id).where(PaperCategory.paper_id.in_(ids)).distinct()
+            ).scalars())
+
+            rows = []
+            for paper in papers:
+                if paper.id in done:
+                    continue
+                for link in PaperCategory.from_categories(json.loads(paper.categories)):
+                    rows.append({"paper_id": paper.id, "category": link.category, "archive": link.archive})
+
+            if rows:
+                db.execute(insert(PaperCategory), rows)
+            db.commit()
+
+            added += len(rows)
+            last_id = ids[-1]
+            print(f"   💾 Backfilled papers up to id {last_id} ({added} category rows)")
+
+        print(f"✓ Backfill complete: {added} category rows added")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
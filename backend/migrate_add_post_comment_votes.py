@@ -0,0 +1,20 @@
+"""
+Migration script to add post comment votes and the post comments pagination index
+Run this once to update an existing database (new databases get them from init_db)
+"""
+from database import engine
+from models import PostComment, PostCommentVote
+
+
+def migrate():
+    print("Creating post_comment_votes table (if missing)...")
+    PostCommentVote.__table__.create(bind=engine, checkfirst=True)
+
+    for index in PostComment.__table__.indexes:
+        print(f"Creating index {index.name} (if missing)...")
+        index.create(bind=engine, checkfirst=True)
+    print("✓ Post comment votes and indexes are in place!")
+
+
+if __name__ == "__main__":
+    migrate()
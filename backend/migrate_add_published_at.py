@@ -0,0 +1,98 @@
+"""
+Migration script to add typed published_at / updated_at columns to the papers table
+Run this once to update an existing database; it parses the ISO string columns
+in batches, so it can be re-run after an interruption and picks up where it stopped
+Run it before migrate_add_hot_score.py, which scores papers by published_at
+"""
+from sqlalchemy import inspect, select, text, update
+
+from database import SessionLocal, engine
+from models import Paper
+
+BACKFILL_BATCH_SIZE = 1000
+
+INDEXES = ("ix_papers_published_at_id", "ix_papers_published_at_vote_count")
+# Feed index on the ISO string column, replaced by ix_papers_published_at_id
+OBSOLETE_INDEXES = ("ix_papers_published_id",)
+
+
+def parse_or_none(value):
+    try:
+        return Paper.parse_timestamp(value)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def backfill(db, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Fill published_at / updated_at where missing, one short transaction per batch"""
+    updated = 0
+    unparseable = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Paper.id, Paper.published, Paper.updated)
+            .where(Paper.published_at.is_(None), Paper.id > last_id)
+            .order_by(Paper.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        values = []
+        for row in rows:
+            published_at = parse_or_none(row.published)
+            if published_at is None:
+                unparseable += 1
+                continue
+            values.append({"id": row.id, "published_at": published_at, "updated_at": parse_or_none(row.updated)})
+
+        # ORM bulk UPDATE by primary key (executemany)
+        if values:
+            db.execute(update(Paper), values)
+        db.commit()
+
+        updated += len(values)
+        last_id = rows[-1].id
+        print(f"  ...{updated} papers")
+
+    if unparseable:
+        print(f"⚠️ {unparseable} papers have an unparseable published date and were left empty")
+    return updated
+
+
+def migrate():
+    columns = [column["name"] for column in inspect(engine).get_columns("papers")]
+    column_type = "TIMESTAMP" if engine.dialect.name == "postgresql" else "DATETIME"
+
+    for name in ("published_at", "updated_at"):
+        if name in columns:
+            print(f"✓ Column '{name}' already exists.")
+        else:
+            print(f"Adding {name} column to papers table...")
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE papers ADD COLUMN {name} {column_type}"))
+            print(f"✓ Successfully added {name} column!")
+
+    print("Backfilling publication timestamps...")
+    db = SessionLocal()
+    try:
+        updated = backfill(db)
+        print(f"✓ Parsed dates for {updated} papers")
+    finally:
+        db.close()
+
+    # After the backfill, so the indexes are built once instead of updated row by row
+    for index in Paper.__table__.indexes:
+        if index.name in INDEXES:
+            print(f"Creating index {index.name} (if missing)...")
+            index.create(bind=engine, checkfirst=True)
+    print("✓ Publication timestamp indexes are in place!")
+
+    with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            print(f"Dropping index {name} (if present)...")
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,64 @@
+"""
+Migration script to rewrite papers.authors without JSON \\u escapes
+The scraper used to store "Jürgen Müller" as "J\\u00fcrgen M\\u00fcller", which the
+search index can't match. Run this once to update an existing database; it works
+in batches and can be re-run (escaped rows are found again until they're fixed)
+"""
+import json
+
+from sqlalchemy import func, select, update
+
+from database import SessionLocal, engine
+from models import Paper
+from search import rebuild_search_index
+
+BATCH_SIZE = 1000
+
+
+def escaped():
+    # Every non-ASCII character json.dumps writes comes out as \uXXXX
+    return Paper.authors.contains("\\u", autoescape=True)
+
+
+def migrate():
+    db = SessionLocal()
+    try:
+        rewritten = 0
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(Paper.id, Paper.authors)
+                .where(escaped(), Paper.id > last_id)
+                .order_by(Paper.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+
+            # ORM bulk UPDATE by primary key (executemany)
+            db.execute(update(Paper), [
+                {"id": row.id, "authors": json.dumps(json.loads(row.authors), ensure_ascii=False)}
+                for row in rows
+            ])
+            db.commit()
+
+            rewritten += len(rows)
+            last_id = rows[-1].id
+            print(f"  ...{rewritten} papers")
+        print(f"✓ Rewrote the authors of {rewritten} papers")
+
+        if rewritten:
+            print("Rebuilding the search index...")
+            rebuild_search_index(engine)
+            print("✓ Search index rebuilt!")
+
+        # Only names with a literal backslash-u should be left (rewriting them is a no-op)
+        remaining = db.execute(select(func.count()).where(escaped())).scalar()
+        if remaining:
+            print(f"⚠️ {remaining} papers still have \\u in their authors")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
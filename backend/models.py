@@ -1,12 +1,11 @@
+import re
+import unicodedata
 import sqlalchemy
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Boolean, Index, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from datetime import datetime
-from passlib.context import CryptContext
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from datetime import datetime, timezone
+from passwords import hash_password_sync, verify_password_sync
 
 Base = declarative_base()
 
@@ -27,13 +26,15 @@ class User(Base):
     posts = relationship("Post", back_populates="user", cascade="all, delete-orphan")
     post_votes = relationship("PostVote", back_populates="user", cascade="all, delete-orphan")
     post_comments = relationship("PostComment", back_populates="user", cascade="all, delete-orphan")
+    post_comment_votes = relationship("PostCommentVote", back_populates="user", cascade="all, delete-orphan")
 
+    # Blocking helpers for scripts; routes use the async versions in passwords.py
     def verify_password(self, password: str) -> bool:
-        return pwd_context.verify(password, self.password_hash)
+        return verify_password_sync(password, self.password_hash)[0]
 
     @staticmethod
     def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
+        return hash_password_sync(password)
 
 
 class Paper(Base):
@@ -46,8 +47,10 @@ class Paper(Base):
     abstract = Column(Text, nullable=False)
     pdf_url = Column(String, nullable=False)
     arxiv_url = Column(String, nullable=False)
-    published = Column(String, nullable=False)  # ISO date string
+    published = Column(String, nullable=False)  # ISO date string, as sent by arXiv
     updated = Column(String, nullable=False)
+    published_at = Column(DateTime, nullable=True)  # `published` parsed (naive UTC); filter and sort on this
+    updated_at = Column(DateTime, nullable=True)
     categories = Column(Text, nullable=False)  # JSON array as string
     primary_category = Column(String, nullable=False)
     comment = Column(Text, nullable=True)
@@ -58,10 +61,104 @@ class Paper(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     vote_count = Column(Integer, default=0)
     comment_count = Column(Integer, default=0)
+    hot_score = Column(Float, default=0.0)  # Maintained by ranking.py
 
     # Relationships
     votes = relationship("Vote", back_populates="paper", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="paper", cascade="all, delete-orphan")
+    category_links = relationship("PaperCategory", back_populates="paper", cascade="all, delete-orphan")
+    author_links = relationship("PaperAuthor", back_populates="paper", cascade="all, delete-orphan")
+
+    # Keyset pagination indexes for the feed sorts (see feed.py)
+    __table_args__ = (
+        Index("ix_papers_vote_count_id", "vote_count", "id"),
+        Index("ix_papers_comment_count_id", "comment_count", "id"),
+        Index("ix_papers_hot_score_id", "hot_score", "id"),
+        Index("ix_papers_published_at_id", "published_at", "id"),
+        # Time-window feeds: a range scan on published_at, most voted first
+        Index("ix_papers_published_at_vote_count", "published_at", "vote_count"),
+    )
+
+    @staticmethod
+    def parse_timestamp(value: str) -> datetime:
+        """Parse an arXiv ISO timestamp ('2024-01-15T18:00:00Z') into naive UTC"""
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+
+class PaperCategory(Base):
+    """One row per (paper, category) so category filters can use an index"""
+    __tablename__ = "paper_categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    paper_id = Column(Integer, ForeignKey("papers.id"), nullable=False)
+    category = Column(String, nullable=False)  # e.g. 'cs.LG', 'quant-ph'
+    archive = Column(String, nullable=False)  # e.g. 'cs', 'quant-ph'
+
+    paper = relationship("Paper", back_populates="category_links")
+
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('paper_id', 'category', name='_paper_category_uc'),
+        Index("ix_paper_categories_category_paper_id", "category", "paper_id"),
+        Index("ix_paper_categories_archive_paper_id", "archive", "paper_id"),
+    )
+
+    @staticmethod
+    def archive_of(category: str) -> str:
+        return category.split(".", 1)[0]
+
+    @classmethod
+    def from_categories(cls, categories):
+        """Build the rows for a paper's category list (duplicates dropped)"""
+        return [
+            cls(category=category, archive=cls.archive_of(category))
+            for category in dict.fromkeys(categories)
+        ]
+
+
+class StatsCounter(Base):
+    """Named running totals (papers, votes, per-category counts...) so stats never need COUNT(*)"""
+    __tablename__ = "stats_counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class Author(Base):
+    __tablename__ = "authors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)  # Display name as first scraped
+    normalized_name = Column(String, unique=True, index=True, nullable=False)
+
+    paper_links = relationship("PaperAuthor", back_populates="author")
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """'José  A. García' -> 'jose a garcia' (accents, case, punctuation and spacing folded)"""
+        decomposed = unicodedata.normalize("NFKD", name)
+        stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+        return " ".join(re.sub(r"[^\w\s-]", " ", stripped.lower()).split())
+
+
+class PaperAuthor(Base):
+    __tablename__ = "paper_authors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    paper_id = Column(Integer, ForeignKey("papers.id"), nullable=False)
+    author_id = Column(Integer, ForeignKey("authors.id"), nullable=False)
+    position = Column(Integer, nullable=False)  # Order in the author list
+
+    paper = relationship("Paper", back_populates="author_links")
+    author = relationship("Author", back_populates="paper_links")
+
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('paper_id', 'author_id', name='_paper_author_uc'),
+        Index("ix_paper_authors_author_id_paper_id", "author_id", "paper_id"),
+    )
 
 
 class Vote(Base):
@@ -164,3 +261,24 @@ class PostComment(Base):
     # Relationships
     post = relationship("Post", back_populates="post_comments")
     user = relationship("User", back_populates="post_comments")
+    post_comment_votes = relationship("PostCommentVote", back_populates="comment", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_post_comments_post_id_created_at_id", "post_id", "created_at", "id"),
+    )
+
+
+class PostCommentVote(Base):
+    __tablename__ = "post_comment_votes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    comment_id = Column(Integer, ForeignKey("post_comments.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    comment = relationship("PostComment", back_populates="post_comment_votes")
+    user = relationship("User", back_populates="post_comment_votes")
+
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('comment_id', 'user_id', name='_post_comment_user_vote_uc'),
+    )
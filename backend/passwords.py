@@ -0,0 +1,54 @@
+"""
+Password hashing off the event loop
+
+bcrypt is deliberately slow (~250 ms at the default cost), so register/login
+run it in a small process pool instead of the request handler. The cost
+factor comes from BCRYPT_ROUNDS; hashes made with an older cost still verify
+and are upgraded the next time their owner logs in.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 hashes in the default thread pool instead of separate processes
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_pool = None
+
+
+def hash_password_sync(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password_sync(password: str, password_hash: str):
+    """(matches, new_hash); new_hash is set when the stored hash uses an outdated cost"""
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+def get_pool():
+    global _pool
+    if _pool is None and PASSWORD_HASH_WORKERS > 0:
+        _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), hash_password_sync, password)
+
+
+async def verify_password(password: str, password_hash: str):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), verify_password_sync, password, password_hash)
@@ -0,0 +1,104 @@
+"""
+Queries for Show AN posts and their comments
+
+Every list is one select that projects just the columns the API returns,
+joined to the author's username, so a page costs a fixed number of queries
+however many rows it has. Post comments are paged newest first with a
+keyset cursor on (created_at, id).
+"""
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+
+import feed
+from models import Post, PostComment, PostCommentVote, User
+
+DEFAULT_COMMENT_PAGE_SIZE = 50
+MAX_COMMENT_PAGE_SIZE = 200
+
+POST_COLUMNS = (
+    Post.id, Post.title, Post.url, Post.text, Post.vote_count,
+    Post.comment_count, Post.created_at, Post.user_id, User.username,
+)
+
+COMMENT_COLUMNS = (
+    PostComment.id, PostComment.content, PostComment.vote_count,
+    PostComment.created_at, PostComment.user_id, User.username,
+)
+
+
+def posts_query(sort: str = "hot", limit: int = 30):
+    query = select(*POST_COLUMNS).outerjoin(User, User.id == Post.user_id)
+
+    if sort == "new":
+        query = query.order_by(Post.created_at.desc())
+    else:  # hot
+        query = query.order_by(Post.vote_count.desc(), Post.created_at.desc())
+
+    return query.limit(limit)
+
+
+def post_query(post_id: int):
+    return select(*POST_COLUMNS).outerjoin(User, User.id == Post.user_id).where(Post.id == post_id)
+
+
+def post_to_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "url": row.url,
+        "text": row.text,
+        "vote_count": row.vote_count,
+        "comment_count": row.comment_count,
+        "created_at": row.created_at.isoformat(),
+        "username": row.username or "deleted",
+        "user_id": row.user_id
+    }
+
+
+def post_comments_query(post_id: int, cursor: str = None, limit: int = DEFAULT_COMMENT_PAGE_SIZE):
+    """Select one page of a post's comments, newest first (limit + 1 rows to detect a next page)"""
+    query = (
+        select(*COMMENT_COLUMNS)
+        .outerjoin(User, User.id == PostComment.user_id)
+        .where(PostComment.post_id == post_id)
+    )
+
+    if cursor:
+        created_at, comment_id = feed.decode_cursor(cursor)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise feed.FeedError("Invalid cursor")
+        query = query.where(tuple_(PostComment.created_at, PostComment.id) < tuple_(created_at, comment_id))
+
+    return query.order_by(PostComment.created_at.desc(), PostComment.id.desc()).limit(limit + 1)
+
+
+def paginate_comments(rows, limit: int):
+    """Split the limit + 1 rows into (page, next_cursor)"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, feed.encode_cursor(last.created_at.isoformat(), last.id)
+
+
+def user_votes_query(user_id: int, comment_ids):
+    """Select which of `comment_ids` the user has upvoted"""
+    return select(PostCommentVote.comment_id).where(
+        PostCommentVote.user_id == user_id,
+        PostCommentVote.comment_id.in_(comment_ids)
+    )
+
+
+def post_comment_to_dict(row, user_votes=frozenset()) -> dict:
+    return {
+        "id": row.id,
+        "content": row.content,
+        "vote_count": row.vote_count,
+        "created_at": row.created_at.isoformat(),
+        "username": row.username or "deleted",
+        "user_id": row.user_id,
+        "user_voted": row.id in user_votes
+    }
@@ -0,0 +1,82 @@
+"""
+HN-style "hot" ranking for papers
+
+score = (votes + COMMENT_WEIGHT * comments + 1) / (age_hours + 2) ** GRAVITY
+
+The score is stored in the indexed `papers.hot_score` column so the hot feed is
+a top-k index scan. Votes and comments update a paper's score immediately and
+refresh_hot_scores() periodically re-decays the recent papers as they age.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from models import Paper
+
+GRAVITY = float(os.getenv("HOT_GRAVITY", "1.8"))
+COMMENT_WEIGHT = float(os.getenv("HOT_COMMENT_WEIGHT", "0.5"))
+
+# Papers older than this keep their last score; it has long since decayed to ~0
+DECAY_WINDOW_DAYS = int(os.getenv("HOT_DECAY_WINDOW_DAYS", "30"))
+REFRESH_BATCH_SIZE = 1000
+
+
+def hot_score(vote_count: int, comment_count: int, published_at: datetime, now: datetime = None) -> float:
+    if published_at is None:
+        # Undated (unparseable `published`): rank it as fully decayed, not as brand new
+        return 0.0
+    now = now or datetime.utcnow()
+    age_hours = max((now - published_at).total_seconds() / 3600, 0)
+
+    points = (vote_count or 0) + COMMENT_WEIGHT * (comment_count or 0) + 1
+    return points / (age_hours + 2) ** GRAVITY
+
+
+def update_hot_score(paper: Paper, now: datetime = None):
+    """Recompute one paper's score after its vote or comment count changed"""
+    paper.hot_score = hot_score(paper.vote_count, paper.comment_count, paper.published_at, now)
+
+
+def rescore_papers(db, paper_ids, now: datetime = None):
+    """Recompute the scores of specific papers (e.g. after a batched vote count update)"""
+    rows = db.execute(
+        select(Paper.id, Paper.vote_count, Paper.comment_count, Paper.published_at)
+        .where(Paper.id.in_(paper_ids))
+    ).all()
+    if rows:
+        db.execute(update(Paper), [
+            {"id": row.id, "hot_score": hot_score(row.vote_count, row.comment_count, row.published_at, now)}
+            for row in rows
+        ])
+
+
+def refresh_hot_scores(db, window_days: int = DECAY_WINDOW_DAYS, batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    """Re-decay the scores of papers published in the last `window_days` (None = all papers)"""
+    now = datetime.utcnow()
+
+    query = select(Paper.id, Paper.vote_count, Paper.comment_count, Paper.published_at)
+    if window_days is not None:
+        query = query.where(Paper.published_at >= now - timedelta(days=window_days))
+
+    # Walk the papers in id order, one short transaction per batch
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            query.where(Paper.id > last_id).order_by(Paper.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        # ORM bulk UPDATE by primary key (executemany)
+        db.execute(update(Paper), [
+            {"id": row.id, "hot_score": hot_score(row.vote_count, row.comment_count, row.published_at, now)}
+            for row in rows
+        ])
+        db.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+
+    return updated
@@ -0,0 +1,158 @@
+"""
+Token-bucket rate limiting for write and search endpoints
+
+A pure ASGI middleware matches each request against RATE_LIMIT_POLICIES and
+takes a token from the bucket for (policy, caller). The caller is the user
+id from a valid bearer token, or the client IP. Buckets live in one bounded
+LRU map, so memory stays flat however many clients show up, and each check
+is O(1). An empty bucket answers 429 with Retry-After before the request
+reaches a route or the database.
+"""
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from serialization import dumps
+from user_cache import user_cache
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Reverse proxies in front of the app that append to X-Forwarded-For (Railway and
+# Render each add one). The client address is the entry the outermost of them
+# appended, counted from the right: entries further left are whatever the client
+# sent. The default 0 keys on the socket address and ignores the header, since
+# without a proxy a client could pick a fresh bucket per request; deployments
+# behind one opt in.
+RATE_LIMIT_PROXY_HOPS = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "0"))
+
+
+class Policy:
+    """`burst` requests at once, refilled at `rate` per second"""
+
+    def __init__(self, name: str, method: str, path: str, rate: float, burst: int):
+        self.name = name
+        self.method = method
+        self.path = re.compile(path)
+        self.rate = rate
+        self.burst = burst
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.path.match(path) is not None
+
+
+RATE_LIMIT_POLICIES = [
+    Policy("vote", "POST", r"^/(papers/[^/]+|comments/\d+|posts/\d+|post-comments/\d+)/vote$", rate=1, burst=10),
+    Policy("comment", "POST", r"^/(papers/[^/]+|posts/\d+)/comments$", rate=0.2, burst=5),
+    Policy("post", "POST", r"^/posts$", rate=1 / 60, burst=3),
+    Policy("search", "GET", r"^/search$", rate=2, burst=20),
+    Policy("auth", "POST", r"^/auth/(login|register)$", rate=0.1, burst=5),
+    Policy("vote_status", "POST", r"^/votes/status$", rate=5, burst=30),
+]
+
+
+class TokenBucketStore:
+    """(tokens, last_refill) per key in a bounded LRU map"""
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MAX_KEYS):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate: float, burst: int, now: float = None) -> float:
+        """Take one token; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+
+            if tokens >= 1:
+                wait = 0.0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # An evicted caller just starts over with a full bucket
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+def client_address(scope, proxy_hops: int = RATE_LIMIT_PROXY_HOPS):
+    """The address the outermost trusted proxy saw, or the socket peer without proxies"""
+    if proxy_hops > 0:
+        # Several X-Forwarded-For headers count as one comma-separated list, in order
+        forwarded = [
+            entry.strip()
+            for name, value in scope.get("headers") or []
+            if name == b"x-forwarded-for"
+            for entry in value.decode("latin-1").split(",")
+        ]
+        forwarded = [entry for entry in forwarded if entry]
+        if len(forwarded) >= proxy_hops:
+            return forwarded[-proxy_hops]
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, secret_key: str, algorithm: str, policies=None, store: TokenBucketStore = None,
+                 proxy_hops: int = RATE_LIMIT_PROXY_HOPS):
+        self.app = app
+        self.proxy_hops = proxy_hops
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.policies = RATE_LIMIT_POLICIES if policies is None else policies
+        self.store = store or TokenBucketStore()
+
+    def identify(self, scope) -> str:
+        """user:<id> for a valid bearer token, else ip:<address>"""
+        headers = scope.get("headers") or []
+
+        authorization = next((value for name, value in headers if name == b"authorization"), b"").decode("latin-1")
+        if authorization[:7].lower() == "bearer ":
+            user_id = user_cache.user_id(authorization[7:].strip(), self.secret_key, self.algorithm)
+            if user_id is not None:
+                return f"user:{user_id}"
+
+        address = client_address(scope, self.proxy_hops)
+        return f"ip:{address or 'unknown'}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        for policy in self.policies:
+            if policy.matches(scope["method"], scope["path"]):
+                wait = self.store.take((policy.name, self.identify(scope)), policy.rate, policy.burst)
+                if wait > 0:
+                    await self.reject(send, wait)
+                    return
+                break
+
+        await self.app(scope, receive, send)
+
+    async def reject(self, send, wait: float):
+        body = dumps({"detail": "Too many requests, slow down"})
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(wait)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,186 @@
+"""
+Reconcile denormalized counters with the rows they count
+
+vote_count / comment_count / karma are kept up to date with `+= 1` in the
+routes, which can race, and deleting a comment leaves its replies orphaned
+(still counted, but no longer shown). This job recomputes each counter with
+GROUP BY queries and fixes the rows that drifted with one UPDATE ... FROM per
+chunk of RECONCILE_BATCH_SIZE ids, committing between chunks so no lock is
+held for long. It returns (and logs) how much drift it found.
+
+A vote that lands while its chunk is being reconciled can still leave a
+counter off by one; the next run fixes it.
+"""
+import os
+
+from sqlalchemy import func, literal, select, union_all, update
+
+import ranking
+from models import Comment, CommentVote, Paper, Post, PostComment, PostCommentVote, PostVote, User, Vote
+
+RECONCILE_BATCH_SIZE = int(os.getenv("RECONCILE_BATCH_SIZE", "1000"))
+
+
+def paper_votes(lo: int, hi: int):
+    return (
+        select(Vote.paper_id.label("target_id"), func.count().label("actual"))
+        .where(Vote.paper_id.between(lo, hi))
+        .group_by(Vote.paper_id)
+    )
+
+
+def paper_comments(lo: int, hi: int):
+    """Comments that are actually shown: roots and replies whose whole parent chain exists"""
+    visible = (
+        select(Comment.id.label("id"), Comment.paper_id.label("paper_id"))
+        .where(Comment.paper_id.between(lo, hi), Comment.parent_id.is_(None))
+        .cte("visible_comments", recursive=True)
+    )
+    visible = visible.union_all(
+        select(Comment.id, Comment.paper_id).where(Comment.parent_id == visible.c.id)
+    )
+    return (
+        select(visible.c.paper_id.label("target_id"), func.count().label("actual"))
+        .group_by(visible.c.paper_id)
+    )
+
+
+def comment_votes(lo: int, hi: int):
+    return (
+        select(CommentVote.comment_id.label("target_id"), func.count().label("actual"))
+        .where(CommentVote.comment_id.between(lo, hi))
+        .group_by(CommentVote.comment_id)
+    )
+
+
+def post_votes(lo: int, hi: int):
+    return (
+        select(PostVote.post_id.label("target_id"), func.count().label("actual"))
+        .where(PostVote.post_id.between(lo, hi))
+        .group_by(PostVote.post_id)
+    )
+
+
+def post_comments(lo: int, hi: int):
+    return (
+        select(PostComment.post_id.label("target_id"), func.count().label("actual"))
+        .where(PostComment.post_id.between(lo, hi))
+        .group_by(PostComment.post_id)
+    )
+
+
+def post_comment_votes(lo: int, hi: int):
+    return (
+        select(PostCommentVote.comment_id.label("target_id"), func.count().label("actual"))
+        .where(PostCommentVote.comment_id.between(lo, hi))
+        .group_by(PostCommentVote.comment_id)
+    )
+
+
+def user_karma(lo: int, hi: int):
+    """Upvotes received on the user's comments, posts and post comments"""
+    received = union_all(
+        select(Comment.user_id.label("user_id"), literal(1).label("vote"))
+        .join(CommentVote, CommentVote.comment_id == Comment.id)
+        .where(Comment.user_id.between(lo, hi)),
+        select(Post.user_id, literal(1))
+        .join(PostVote, PostVote.post_id == Post.id)
+        .where(Post.user_id.between(lo, hi)),
+        select(PostComment.user_id, literal(1))
+        .join(PostCommentVote, PostCommentVote.comment_id == PostComment.id)
+        .where(PostComment.user_id.between(lo, hi)),
+    ).subquery()
+    return (
+        select(received.c.user_id.label("target_id"), func.count().label("actual"))
+        .group_by(received.c.user_id)
+    )
+
+
+# (name, counter column, builder for the true counts of an id range)
+COUNTERS = [
+    ("papers.vote_count", Paper.vote_count, paper_votes),
+    ("papers.comment_count", Paper.comment_count, paper_comments),
+    ("comments.vote_count", Comment.vote_count, comment_votes),
+    ("posts.vote_count", Post.vote_count, post_votes),
+    ("posts.comment_count", Post.comment_count, post_comments),
+    ("post_comments.vote_count", PostComment.vote_count, post_comment_votes),
+    ("users.karma", User.karma, user_karma),
+]
+
+
+def reconcile_counter(db, column, counts, batch_size: int = RECONCILE_BATCH_SIZE):
+    """Fix one counter column chunk by chunk; returns (ids fixed, total absolute drift)"""
+    table = column.table
+    id_column = table.c.id
+    fixed_ids = []
+    total_drift = 0
+
+    last_id = None
+    while True:
+        chunk = select(id_column).order_by(id_column).limit(batch_size)
+        if last_id is not None:
+            chunk = chunk.where(id_column > last_id)
+        ids = db.execute(chunk).scalars().all()
+        if not ids:
+            break
+        lo, hi = ids[0], ids[-1]
+
+        # True count for every row in the chunk (0 when nothing references it)
+        true_counts = counts(lo, hi).subquery()
+        expected = (
+            select(id_column.label("id"), func.coalesce(true_counts.c.actual, 0).label("actual"))
+            .outerjoin(true_counts, true_counts.c.target_id == id_column)
+            .where(id_column.between(lo, hi))
+            .subquery()
+        )
+        stored = func.coalesce(column, 0)
+        drifted = db.execute(
+            select(id_column, stored, expected.c.actual)
+            .join(expected, expected.c.id == id_column)
+            .where(stored != expected.c.actual)
+        ).all()
+
+        if drifted:
+            # UPDATE ... FROM (expected counts) WHERE the stored value is off
+            db.execute(
+                update(table)
+                .values({column.name: expected.c.actual})
+                .where(id_column == expected.c.id, stored != expected.c.actual)
+            )
+            fixed_ids.extend(row[0] for row in drifted)
+            total_drift += sum(abs(row[1] - row[2]) for row in drifted)
+        db.commit()
+
+        last_id = hi
+
+    return fixed_ids, total_drift
+
+
+def reconcile_counters(db, batch_size: int = RECONCILE_BATCH_SIZE):
+    """Reconcile every counter; returns ({counter: {"rows": n, "drift": total}}, {counter: fixed ids})"""
+    report = {}
+    fixed = {}
+    for name, column, counts in COUNTERS:
+        ids, drift = reconcile_counter(db, column, counts, batch_size)
+        report[name] = {"rows": len(ids), "drift": drift}
+        fixed[name] = ids
+
+    # Papers whose counts changed need new hot scores
+    paper_ids = sorted(set(fixed["papers.vote_count"]) | set(fixed["papers.comment_count"]))
+    for start in range(0, len(paper_ids), batch_size):
+        ranking.rescore_papers(db, paper_ids[start:start + batch_size])
+        db.commit()
+
+    return report, fixed
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        report, _ = reconcile_counters(db)
+        for name, result in report.items():
+            print(f"✓ {name}: fixed {result['rows']} rows (total drift {result['drift']})")
+    finally:
+        db.close()
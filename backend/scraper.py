@@ -6,19 +6,29 @@ import time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from renderarxiv.arxiv_client import search_arxiv
+from cache import response_cache
 from database import SessionLocal, init_db
-from models import Paper as DBPaper
+from models import Paper as DBPaper, PaperCategory
+from ranking import hot_score
+from stats import paper_counter_deltas, stats_counters
+from authors import author_links
 import json
 
+def record_counts(uncommitted):
+    for deltas in uncommitted:
+        stats_counters.add_many(deltas)
+    uncommitted.clear()
+
 def scrape_latest_papers(max_results=5000):
     """Fetch latest papers from arXiv and add to database"""
     
     init_db()
     db = SessionLocal()
+    started_at = time.time()
     
     try:
         # Get the most recent paper we have in database
-        latest_paper = db.query(DBPaper).order_by(DBPaper.published.desc()).first()
+        latest_paper = db.query(DBPaper).order_by(DBPaper.published_at.desc().nulls_last()).first()
         
         if latest_paper:
             print(f"📅 Latest paper in DB: {latest_paper.title[:50]}... ({latest_paper.published})")
@@ -57,6 +67,7 @@ def scrape_latest_papers(max_results=5000):
         # Search each category group
         for cat_num, category in enumerate(categories):
             print(f"\n📂 Category {cat_num + 1}/{len(categories)}: {category}")
+            fetched_for_category = 0
             
             # Fetch multiple batches per category
             for batch_num in range(batches_per_category):
@@ -74,11 +85,12 @@ def scrape_latest_papers(max_results=5000):
                 
                 print(f"   Batch {batch_num + 1}: Retrieved {len(papers)} papers")
                 all_papers.extend(papers)
+                fetched_for_category += len(papers)
                 
                 # Small delay between requests
                 time.sleep(1)
             
-            print(f"   ✓ Total from {category}: {len([p for p in all_papers if any(c.startswith(category.replace('*', '').replace('.*', '')) for c in p.categories)])} papers so far")
+            print(f"   ✓ Total from {category}: {fetched_for_category} papers")
         
         print(f"\n✓ Retrieved {len(all_papers)} papers total from arXiv")
         
@@ -94,6 +106,9 @@ def scrape_latest_papers(max_results=5000):
         
         added = 0
         skipped = 0
+        known_authors = {}
+        # Counter deltas for papers added but not committed yet
+        uncommitted = []
         
         for paper in unique_papers:
             # Check if paper already exists in database
@@ -104,32 +119,47 @@ def scrape_latest_papers(max_results=5000):
                 continue
             
             # Add new paper to database
+            published_at = DBPaper.parse_timestamp(paper.published)
             new_paper = DBPaper(
                 arxiv_id=paper.arxiv_id,
                 title=paper.title,
-                authors=json.dumps(paper.authors),
+                authors=json.dumps(paper.authors, ensure_ascii=False),
                 abstract=paper.abstract,
                 pdf_url=paper.pdf_url,
                 arxiv_url=paper.arxiv_url,
                 published=paper.published,
                 updated=paper.updated,
+                published_at=published_at,
+                updated_at=DBPaper.parse_timestamp(paper.updated),
                 categories=json.dumps(paper.categories),
                 primary_category=paper.primary_category,
                 comment=paper.comment,
                 journal_ref=paper.journal_ref,
                 doi=paper.doi,
+                hot_score=hot_score(0, 0, published_at),
+                category_links=PaperCategory.from_categories(paper.categories),
+                author_links=author_links(db, paper.authors, known_authors),
             )
             db.add(new_paper)
+            uncommitted.append(paper_counter_deltas(new_paper.category_links))
             added += 1
             
             # Commit every 10 papers for safety
             if added % 50 == 0:
                 db.commit()
+                record_counts(uncommitted)
                 print(f"   💾 Committed {added} papers so far...")
         
         # Final commit
         db.commit()
+        record_counts(uncommitted)
         print(f"\n✓ Added {added} new papers (skipped {skipped} duplicates)")
+
+        stats_counters.flush()
+        stats_counters.record_scrape(db, started_at)
+
+        if added:
+            response_cache.invalidate("papers")
         
     except Exception as e:
         print(f"❌ Error: {e}")
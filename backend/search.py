@@ -0,0 +1,214 @@
+"""
+Full-text search index for papers
+
+SQLite uses an FTS5 external-content table kept in sync with `papers` by
+triggers, Postgres uses a generated tsvector column with a GIN index. Both are
+created (and backfilled) by init_search_index(), which init_db() calls, so the
+scraper's inserts are indexed without any extra code.
+
+Authors are indexed straight from the papers.authors JSON, so it must be
+written with ensure_ascii=False: "M\\u00fcller" would never match a search for
+"Müller" (see migrate_unescape_authors.py for rows written before that).
+"""
+import re
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from models import Paper
+
+FTS_TABLE = "papers_fts"
+
+# Title matches outrank abstract matches 2:1, same as the old substring scoring
+SQLITE_BM25_WEIGHTS = "2.0, 1.0, 1.0"  # title, abstract, authors
+POSTGRES_RANK_WEIGHTS = "{0.1, 0.5, 0.5, 1.0}"  # D, C (authors), B (abstract), A (title)
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, abstract, authors,
+        content='papers', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS papers_fts_ai AFTER INSERT ON papers BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, abstract, authors)
+        VALUES (new.id, new.title, new.abstract, new.authors);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS papers_fts_ad AFTER DELETE ON papers BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, abstract, authors)
+        VALUES ('delete', old.id, old.title, old.abstract, old.authors);
+    END
+    """,
+    # Only re-index when searchable text changes, not on every vote/comment count update
+    f"""
+    CREATE TRIGGER IF NOT EXISTS papers_fts_au AFTER UPDATE OF title, abstract, authors ON papers BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, abstract, authors)
+        VALUES ('delete', old.id, old.title, old.abstract, old.authors);
+        INSERT INTO {FTS_TABLE}(rowid, title, abstract, authors)
+        VALUES (new.id, new.title, new.abstract, new.authors);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE papers ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(abstract, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(authors, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_papers_search_vector ON papers USING GIN (search_vector)",
+]
+
+# Which search path each database supports, detected once per engine
+_backends = {}
+
+
+def _backend_key(url):
+    # Sync and async engines on one database share the index
+    return url.set(drivername=url.get_backend_name())
+
+
+def init_search_index(engine) -> str:
+    """Create the search index for this database if it doesn't exist yet"""
+    dialect = engine.dialect.name
+    key = _backend_key(engine.url)
+
+    if dialect == "sqlite":
+        with engine.begin() as conn:
+            existed = conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type='table' AND name=:name"),
+                {"name": FTS_TABLE}
+            ).first()
+            try:
+                for statement in SQLITE_DDL:
+                    conn.execute(text(statement))
+            except OperationalError as e:
+                # SQLite builds without FTS5 fall back to LIKE search
+                print(f"⚠️ FTS5 unavailable, search will use LIKE: {e}")
+                _backends[key] = "like"
+                return "like"
+            if not existed:
+                print("Building full-text index for existing papers...")
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        _backends[key] = "fts5"
+
+    elif dialect == "postgresql":
+        with engine.begin() as conn:
+            for statement in POSTGRES_DDL:
+                conn.execute(text(statement))
+        _backends[key] = "tsvector"
+
+    else:
+        _backends[key] = "like"
+
+    return _backends[key]
+
+
+def rebuild_search_index(engine):
+    """Re-index every paper (Postgres recomputes search_vector on UPDATE by itself)"""
+    if engine.dialect.name == "sqlite" and init_search_index(engine) == "fts5":
+        with engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def detect_backend(conn) -> str:
+    """Return the search path available on this connection's database without creating anything"""
+    key = _backend_key(conn.engine.url)
+    if key in _backends:
+        return _backends[key]
+
+    backend = "like"
+    if conn.dialect.name == "sqlite":
+        if conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": FTS_TABLE}
+        ).first():
+            backend = "fts5"
+    elif conn.dialect.name == "postgresql":
+        if conn.execute(text("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name='papers' AND column_name='search_vector'
+        """)).first():
+            backend = "tsvector"
+
+    _backends[key] = backend
+    return backend
+
+
+def query_terms(q: str):
+    """Split user input into plain word tokens (drops FTS/tsquery operators)"""
+    return re.findall(r"\w+", q.lower())
+
+
+def build_search_query(backend: str, q: str, limit: int):
+    """Build a ranked, limited select of papers matching `q`, or None if nothing to search"""
+    terms = query_terms(q)
+    if not terms:
+        return None
+
+    columns = ", ".join(f"papers.{column.name}" for column in Paper.__table__.columns)
+
+    if backend == "fts5":
+        # Quote every term and prefix-match the last one so results show up while typing
+        match = " ".join(f'"{term}"' for term in terms[:-1])
+        match = f'{match} "{terms[-1]}"*'.strip()
+        statement = text(f"""
+            SELECT {columns}
+            FROM {FTS_TABLE}
+            JOIN papers ON papers.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH :match
+            ORDER BY bm25({FTS_TABLE}, {SQLITE_BM25_WEIGHTS}), papers.vote_count DESC
+            LIMIT :limit
+        """).bindparams(match=match, limit=limit)
+        return select(Paper).from_statement(statement)
+
+    if backend == "tsvector":
+        tsquery = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        statement = text(f"""
+            SELECT {columns}
+            FROM papers, to_tsquery('english', :tsquery) AS query
+            WHERE papers.search_vector @@ query
+            ORDER BY ts_rank('{POSTGRES_RANK_WEIGHTS}', papers.search_vector, query) DESC,
+                     papers.vote_count DESC
+            LIMIT :limit
+        """).bindparams(tsquery=tsquery, limit=limit)
+        return select(Paper).from_statement(statement)
+
+    # No index available: still push filtering, ordering and LIMIT into the database
+    needle = q.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{needle}%"
+    title_match = Paper.title.ilike(pattern, escape="\\")
+    return (
+        select(Paper)
+        .where(
+            title_match
+            | Paper.abstract.ilike(pattern, escape="\\")
+            | Paper.authors.ilike(pattern, escape="\\")
+        )
+        .order_by(title_match.desc(), Paper.vote_count.desc())
+        .limit(limit)
+    )
+
+
+def search_papers(db, q: str, limit: int):
+    """Run a full-text search and return the matching Paper rows, best first"""
+    query = build_search_query(detect_backend(db.connection()), q, limit)
+    if query is None:
+        return []
+    return db.execute(query).scalars().all()
+
+
+async def search_papers_async(db, q: str, limit: int):
+    """search_papers() for an AsyncSession"""
+    backend = await db.run_sync(lambda session: detect_backend(session.connection()))
+    query = build_search_query(backend, q, limit)
+    if query is None:
+        return []
+    return (await db.execute(query)).scalars().all()
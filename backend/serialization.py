@@ -0,0 +1,84 @@
+"""
+Fast JSON serialization and response compression
+
+Bulk endpoints build plain dicts from rows and serialize them straight to bytes
+with orjson, skipping the per-row Pydantic model + jsonable_encoder pass.
+orjson and brotli-asgi are optional: without them we fall back to the stdlib
+json module and gzip.
+"""
+import json
+import os
+import re
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+# Responses smaller than this aren't worth compressing
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+
+# Paths the compression middleware must leave alone (already compressed, or streamed)
+COMPRESS_EXCLUDED_PATHS = [
+    r"^/sitemap-\d+\.xml\.gz$",
+    # Event streams must reach the client as each event is written
+    r"^/stream/",
+]
+
+
+def dumps(content) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: same output as JSONResponse, rendered with orjson when available"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes excluded paths through untouched"""
+
+    def __init__(self, app, excluded_paths=(), **kwargs):
+        super().__init__(app, **kwargs)
+        self.excluded_paths = [re.compile(pattern) for pattern in excluded_paths]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and any(p.search(scope["path"]) for p in self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+def add_compression(app):
+    """Compress responses above COMPRESS_MIN_SIZE with brotli (if installed) or gzip"""
+    if BrotliMiddleware is not None:
+        # Falls back to gzip for clients that don't accept br
+        app.add_middleware(
+            BrotliMiddleware, minimum_size=COMPRESS_MIN_SIZE, excluded_handlers=COMPRESS_EXCLUDED_PATHS
+        )
+    else:
+        app.add_middleware(
+            SelectiveGZipMiddleware, minimum_size=COMPRESS_MIN_SIZE, excluded_paths=COMPRESS_EXCLUDED_PATHS
+        )
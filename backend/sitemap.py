@@ -1,70 +1,193 @@
 """
-Generate sitemap.xml for SEO
+Generate sitemaps for SEO
+
+/sitemap.xml is a sitemap index. It points at gzipped shards of at most
+SITEMAP_SHARD_SIZE paper URLs each (the protocol caps a sitemap at 50,000),
+plus sitemap-0.xml.gz with the site's own pages. Shards are written to disk
+row by row from a streamed (arxiv_id, created_at) query. They are only
+rebuilt when the papers in their id range change, so in practice just the
+newest shard is rewritten after a scrape.
 """
+import glob
+import gzip
+import io
+import os
+import tempfile
 from datetime import datetime
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func, select
+
 from database import SessionLocal
 from models import Paper
 
+SITE_URL = os.getenv("SITE_URL", "https://arxiv-news.com").rstrip("/")
+SITEMAP_SHARD_SIZE = min(int(os.getenv("SITEMAP_SHARD_SIZE", "50000")), 50000)
+SITEMAP_CACHE_DIR = os.getenv("SITEMAP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "arxiv_news_sitemaps"))
+
+# Canonical pages only - no query params (robots.txt disallows them)
+STATIC_PAGES = [
+    ("/", "hourly", "1.0"),
+    ("/show", "daily", "0.8"),
+]
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Shard:
+    """A contiguous id range of papers that goes into one sitemap file"""
+
+    def __init__(self, number: int, first_id: int, last_id: int, count: int, lastmod: datetime):
+        self.number = number
+        self.first_id = first_id
+        self.last_id = last_id
+        self.count = count
+        self.lastmod = lastmod
+
+    @property
+    def fingerprint(self) -> str:
+        # Any insert or delete inside the range changes one of these
+        return f"{self.first_id}-{self.last_id}-{self.count}"
+
+
+def iter_paper_shards(db):
+    """Split papers into shards by id; a couple of cheap indexed queries per shard"""
+    number = 0
+    start_id = None
+    while True:
+        ids = select(Paper.id).order_by(Paper.id).limit(SITEMAP_SHARD_SIZE)
+        if start_id is not None:
+            ids = ids.where(Paper.id > start_id)
+        ids = ids.subquery()
+
+        first_id, last_id, count = db.execute(
+            select(func.min(ids.c.id), func.max(ids.c.id), func.count(ids.c.id))
+        ).one()
+        if not count:
+            return
+
+        lastmod = db.execute(
+            select(func.max(Paper.created_at)).where(Paper.id.between(first_id, last_id))
+        ).scalar()
+        number += 1
+        yield Shard(number, first_id, last_id, count, lastmod)
+        start_id = last_id
+
+
+def url_entry(loc: str, changefreq: str, priority: str, lastmod: datetime = None) -> str:
+    entry = f"  <url>\n    <loc>{escape(loc)}</loc>\n"
+    if lastmod is not None:
+        entry += f"    <lastmod>{lastmod.strftime('%Y-%m-%d')}</lastmod>\n"
+    return entry + f"    <changefreq>{changefreq}</changefreq>\n    <priority>{priority}</priority>\n  </url>\n"
+
+
+def iter_urlset(entries):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    yield from entries
+    yield '</urlset>\n'
+
+
+def iter_sitemap_index(shards):
+    """Sitemap index XML for the static-pages sitemap plus every paper shard"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    yield f"  <sitemap>\n    <loc>{SITE_URL}/sitemap-0.xml.gz</loc>\n  </sitemap>\n"
+    for shard in shards:
+        yield f"  <sitemap>\n    <loc>{SITE_URL}/sitemap-{shard.number}.xml.gz</loc>\n"
+        if shard.lastmod is not None:
+            yield f"    <lastmod>{shard.lastmod.strftime('%Y-%m-%d')}</lastmod>\n"
+        yield "  </sitemap>\n"
+    yield '</sitemapindex>\n'
+
+
+def static_entries():
+    today = datetime.now()
+    for path, changefreq, priority in STATIC_PAGES:
+        yield url_entry(f"{SITE_URL}{path}", changefreq, priority, today)
+
+
+def paper_entries(db, shard: Shard):
+    """Stream one shard's paper URLs without loading Paper objects"""
+    rows = db.execute(
+        select(Paper.arxiv_id, Paper.created_at)
+        .where(Paper.id.between(shard.first_id, shard.last_id))
+        .order_by(Paper.id)
+        .execution_options(yield_per=1000)
+    )
+    for arxiv_id, created_at in rows:
+        yield url_entry(f"{SITE_URL}/paper/{arxiv_id}", "weekly", "0.7", created_at)
+
+
+def write_gzip(path: str, chunks):
+    """Gzip chunks into path atomically, so concurrent readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as out:
+            for chunk in chunks:
+                out.write(chunk.encode("utf-8"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def shard_path(shard: Shard) -> str:
+    return os.path.join(SITEMAP_CACHE_DIR, f"sitemap-{shard.number}-{shard.fingerprint}.xml.gz")
+
+
+def build_shard(db, shard: Shard) -> str:
+    """Path to the shard's cached file, (re)generating it if its papers changed"""
+    path = shard_path(shard)
+    if not os.path.exists(path):
+        write_gzip(path, iter_urlset(paper_entries(db, shard)))
+        # Drop earlier versions of this shard
+        for stale in glob.glob(os.path.join(SITEMAP_CACHE_DIR, f"sitemap-{shard.number}-*.xml.gz")):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+    return path
+
+
+def open_shard(db, number: int):
+    """Open sitemap-<number>.xml.gz for reading, or None if there is no such shard"""
+    if number == 0:
+        # A couple of URLs dated today: cheap enough to rebuild every time
+        xml = "".join(iter_urlset(static_entries()))
+        return io.BytesIO(gzip.compress(xml.encode("utf-8"), mtime=0))
+
+    for shard in iter_paper_shards(db):
+        if shard.number == number:
+            # Open before returning: another worker may replace the file meanwhile
+            return open(build_shard(db, shard), "rb")
+    return None
+
+
+def iter_file(f):
+    with f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
 def generate_sitemap():
-    """Generate XML sitemap of all papers"""
+    """Build every shard and write the index to sitemap.xml; returns the number of paper URLs"""
     db = SessionLocal()
 
     try:
-        # Get all papers, not just the last 1000
-        papers = db.query(Paper).order_by(Paper.created_at.desc()).all()
-
-        xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-
-        # Homepage
-        xml += '  <url>\n'
-        xml += '    <loc>https://arxiv-news.com/</loc>\n'
-        xml += '    <changefreq>hourly</changefreq>\n'
-        xml += '    <priority>1.0</priority>\n'
-        xml += f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>\n'
-        xml += '  </url>\n'
-
-        # Main sort pages (no query params - use canonical versions)
-        sort_pages = [
-            ('hot', 1.0, 'hourly'),
-            ('new', 0.9, 'hourly'),
-            ('discussed', 0.9, 'hourly'),
-        ]
-        for sort_type, priority, freq in sort_pages:
-            xml += '  <url>\n'
-            xml += f'    <loc>https://arxiv-news.com/?sort={sort_type}</loc>\n'
-            xml += f'    <changefreq>{freq}</changefreq>\n'
-            xml += f'    <priority>{priority}</priority>\n'
-            xml += f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>\n'
-            xml += '  </url>\n'
-
-        # Category pages (combine with sort for better coverage)
-        categories = ['all', 'cs.AI', 'cs.LG', 'cs.CV', 'cs.CL', 'cs.RO', 'stat.ML', 'math', 'physics', 'quant-ph']
-        for cat in categories:
-            xml += '  <url>\n'
-            xml += f'    <loc>https://arxiv-news.com/?sort=hot&cat={cat}</loc>\n'
-            xml += '    <changefreq>daily</changefreq>\n'
-            xml += '    <priority>0.8</priority>\n'
-            xml += f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>\n'
-            xml += '  </url>\n'
-
-        # Paper pages
-        for paper in papers:
-            xml += '  <url>\n'
-            xml += f'    <loc>https://arxiv-news.com/paper/{paper.arxiv_id}</loc>\n'
-            xml += f'    <lastmod>{paper.created_at.strftime("%Y-%m-%d")}</lastmod>\n'
-            xml += '    <changefreq>weekly</changefreq>\n'
-            xml += '    <priority>0.6</priority>\n'
-            xml += '  </url>\n'
-
-        xml += '</urlset>'
-
-        return xml
+        shards = list(iter_paper_shards(db))
+        for shard in shards:
+            build_shard(db, shard)
+
+        with open("sitemap.xml", "w") as f:
+            f.writelines(iter_sitemap_index(shards))
+        return sum(shard.count for shard in shards)
     finally:
         db.close()
 
 if __name__ == "__main__":
-    sitemap = generate_sitemap()
-    with open("sitemap.xml", "w") as f:
-        f.write(sitemap)
-    print(f"✓ Sitemap generated with {sitemap.count('<url>')} URLs")
+    count = generate_sitemap()
+    print(f"✓ Sitemap index written with {count} paper URLs in {SITEMAP_CACHE_DIR}")
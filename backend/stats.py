@@ -0,0 +1,258 @@
+"""
+Running totals for /status and category counts
+
+Instead of COUNT(*) over growing tables on every poll, routes and the scraper
+record +/- deltas here as they write. Deltas are summed in memory and flushed
+every STATS_FLUSH_INTERVAL_SECONDS as one upsert per counter into
+stats_counters, so a burst of votes doesn't serialize on a single hot row.
+Reads are primary-key lookups plus this process's unflushed deltas.
+`recount` rebuilds every total from the base tables (on an empty table at
+startup, or to repair drift after a crash lost unflushed deltas), and `drift`
+reports which counters disagree with such a recount.
+
+Usage:
+    python stats.py            # list counters that drifted from the base tables
+    python stats.py --recount  # and rewrite them
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import distinct, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import SessionLocal
+from models import Comment, Paper, PaperCategory, Post, PostComment, StatsCounter, User, Vote
+
+STATS_FLUSH_INTERVAL_SECONDS = float(os.getenv("STATS_FLUSH_INTERVAL_SECONDS", "5"))
+
+PAPERS = "papers"
+VOTES = "votes"
+COMMENTS = "comments"
+POSTS = "posts"
+POST_COMMENTS = "post_comments"
+USERS = "users"
+LAST_SCRAPE_AT = "last_scrape_at"  # unix seconds
+LAST_SCRAPE_MS = "last_scrape_ms"  # duration
+
+CATEGORY_PREFIX = "category:"
+ARCHIVE_PREFIX = "archive:"
+
+# Totals recount() can rebuild from a table
+TABLE_COUNTS = {
+    PAPERS: Paper.id,
+    VOTES: Vote.id,
+    COMMENTS: Comment.id,
+    POSTS: Post.id,
+    POST_COMMENTS: PostComment.id,
+    USERS: User.id,
+}
+
+counters_table = StatsCounter.__table__
+
+
+def paper_counter_deltas(category_links) -> dict:
+    """Deltas for adding one paper with these PaperCategory rows"""
+    deltas = {PAPERS: 1}
+    for link in category_links:
+        deltas[CATEGORY_PREFIX + link.category] = 1
+        deltas[ARCHIVE_PREFIX + link.archive] = 1
+    return deltas
+
+
+def upsert_counters(db, values: dict, increment: bool = False):
+    """Set (or add to) counters, creating missing rows"""
+    if not values:
+        return
+    now = datetime.utcnow()
+    rows = [{"name": name, "value": value, "updated_at": now} for name, value in values.items()]
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        stmt = insert(counters_table)
+        value = counters_table.c.value + stmt.excluded.value if increment else stmt.excluded.value
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[counters_table.c.name],
+                set_={"value": value, "updated_at": stmt.excluded.updated_at}
+            ),
+            rows
+        )
+        return
+
+    # Other databases: update, then insert what wasn't there
+    for row in rows:
+        value = counters_table.c.value + row["value"] if increment else row["value"]
+        result = db.execute(
+            update(counters_table)
+            .where(counters_table.c.name == row["name"])
+            .values(value=value, updated_at=row["updated_at"])
+        )
+        if result.rowcount == 0:
+            db.execute(counters_table.insert().values(**row))
+
+
+def count_totals(db) -> dict:
+    """Every table, category and archive total, counted from the base tables"""
+    values = {name: db.execute(select(func.count(column))).scalar() for name, column in TABLE_COUNTS.items()}
+    for category, count in db.execute(
+        select(PaperCategory.category, func.count()).group_by(PaperCategory.category)
+    ):
+        values[CATEGORY_PREFIX + category] = count
+    # A paper in two categories of one archive counts once, as in paper_counter_deltas
+    for archive, count in db.execute(
+        select(PaperCategory.archive, func.count(distinct(PaperCategory.paper_id)))
+        .group_by(PaperCategory.archive)
+    ):
+        values[ARCHIVE_PREFIX + archive] = count
+
+    # Categories that no longer have papers drop to zero
+    for prefix in (CATEGORY_PREFIX, ARCHIVE_PREFIX):
+        for name in db.execute(
+            select(StatsCounter.name).where(StatsCounter.name.startswith(prefix))
+        ).scalars():
+            values.setdefault(name, 0)
+    return values
+
+
+class StatsCounters:
+    def __init__(self, session_factory=SessionLocal, interval: float = STATS_FLUSH_INTERVAL_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._deltas = defaultdict(int)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def add(self, name: str, delta: int = 1):
+        """Record a change; call after the write it counts has committed"""
+        if delta:
+            with self._lock:
+                self._deltas[name] += delta
+
+    def add_many(self, deltas: dict):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._deltas[name] += delta
+
+    def flush(self) -> int:
+        """Write pending deltas in one transaction; returns the number of counters touched"""
+        with self._flush_lock:
+            with self._lock:
+                deltas = {name: delta for name, delta in self._deltas.items() if delta}
+                self._deltas.clear()
+            if not deltas:
+                return 0
+
+            db = self.session_factory()
+            try:
+                upsert_counters(db, deltas, increment=True)
+                db.commit()
+            except Exception:
+                db.rollback()
+                # Put the deltas back so the next flush retries them
+                self.add_many(deltas)
+                raise
+            finally:
+                db.close()
+            return len(deltas)
+
+    def read(self, db, names) -> dict:
+        """Current value of each counter (0 if it doesn't exist yet)"""
+        names = list(names)
+        values = dict.fromkeys(names, 0)
+        values.update(db.execute(
+            select(StatsCounter.name, StatsCounter.value).where(StatsCounter.name.in_(names))
+        ).all())
+        with self._lock:
+            for name in names:
+                values[name] += self._deltas.get(name, 0)
+        return values
+
+    def read_prefix(self, db, prefix: str) -> dict:
+        """{suffix: value} for every counter named prefix + suffix"""
+        # A range on the primary key rather than LIKE, so it stays an index scan
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = db.execute(
+            select(StatsCounter.name, StatsCounter.value)
+            .where(StatsCounter.name >= prefix, StatsCounter.name < upper)
+        ).all()
+        values = {name: value for name, value in rows}
+        with self._lock:
+            for name, delta in self._deltas.items():
+                if name.startswith(prefix):
+                    values[name] = values.get(name, 0) + delta
+        return {name[len(prefix):]: value for name, value in values.items() if value}
+
+    def record_scrape(self, db, started_at: float, finished_at: float = None):
+        finished_at = time.time() if finished_at is None else finished_at
+        upsert_counters(db, {
+            LAST_SCRAPE_AT: int(finished_at),
+            LAST_SCRAPE_MS: int((finished_at - started_at) * 1000),
+        })
+        db.commit()
+
+    def recount(self, db) -> int:
+        """Rebuild every count from the base tables; returns the number of counters written"""
+        with self._flush_lock:
+            # Pending deltas are covered by the recount
+            with self._lock:
+                self._deltas.clear()
+
+            values = count_totals(db)
+            upsert_counters(db, values)
+            db.commit()
+            return len(values)
+
+    def drift(self, db) -> dict:
+        """{name: (counted, recounted)} for every counter the deltas got wrong"""
+        with self._flush_lock:
+            expected = count_totals(db)
+            actual = self.read(db, expected)
+        return {
+            name: (actual[name], value)
+            for name, value in expected.items() if actual[name] != value
+        }
+
+    def ensure_initialized(self):
+        """Count everything once if the table is empty (new table or fresh database)"""
+        db = self.session_factory()
+        try:
+            if db.execute(select(StatsCounter.name).limit(1)).first() is None:
+                return self.recount(db)
+            return 0
+        finally:
+            db.close()
+
+    async def run(self):
+        """Flush on a fixed interval until cancelled"""
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await loop.run_in_executor(None, self.flush)
+            except Exception as e:
+                print(f"❌ Error flushing stats counters: {e}")
+
+
+stats_counters = StatsCounters()
+
+
+if __name__ == "__main__":
+    import sys
+
+    db = SessionLocal()
+    try:
+        drifted = stats_counters.drift(db)
+        for name, (counted, recounted) in sorted(drifted.items()):
+            print(f"⚠️  {name}: counter says {counted}, tables say {recounted}")
+        if not drifted:
+            print("✓ Every counter matches the base tables")
+        elif "--recount" in sys.argv:
+            print(f"✓ Recounted {stats_counters.recount(db)} counters")
+    finally:
+        db.close()
@@ -0,0 +1,83 @@
+"""
+Cached authentication
+
+Authenticated routes only need a handful of the user's columns, so instead of
+loading the User row on every request we keep a short-lived snapshot per
+user_id, and remember which user each (already verified) token belongs to.
+Routes that change a user's profile or karma call `user_cache.invalidate`;
+the TTL bounds how stale another worker's copy can get.
+"""
+import os
+import time
+
+from jose import JWTError, jwt
+
+from cache import LRUCache
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+
+class UserSnapshot:
+    """Read-only copy of the User columns routes use; not attached to any session"""
+
+    __slots__ = ("id", "username", "email", "bio", "karma", "created_at")
+
+    def __init__(self, id, username, email, bio, karma, created_at):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.bio = bio
+        self.karma = karma
+        self.created_at = created_at
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email, user.bio, user.karma, user.created_at)
+
+
+class UserCache:
+    def __init__(self, maxsize: int = USER_CACHE_MAX_ENTRIES, ttl: float = USER_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.tokens = LRUCache(maxsize, ttl)
+        self.users = LRUCache(maxsize, ttl)
+
+    def user_id(self, token: str, secret_key: str, algorithm: str):
+        """User id from the token's `sub`, or None if the token is invalid or expired"""
+        user_id = self.tokens.get(token)
+        if user_id is not None:
+            return user_id
+
+        try:
+            payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+            user_id = int(payload.get("sub"))
+        except (JWTError, TypeError, ValueError):
+            return None
+
+        # Never remember a token past its own expiry
+        ttl = self.ttl
+        if payload.get("exp") is not None:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            self.tokens.set(token, user_id, ttl)
+        return user_id
+
+    def get(self, user_id: int):
+        return self.users.get(user_id)
+
+    def set(self, user) -> UserSnapshot:
+        snapshot = UserSnapshot.from_user(user)
+        if self.ttl > 0:
+            self.users.set(user.id, snapshot)
+        return snapshot
+
+    def invalidate(self, *user_ids: int):
+        for user_id in user_ids:
+            self.users.delete(user_id)
+
+    def clear(self):
+        self.tokens.clear()
+        self.users.clear()
+
+
+user_cache = UserCache()
@@ -0,0 +1,97 @@
+"""
+Write-behind aggregation for paper vote counts
+
+With VOTE_BUFFER_ENABLED, vote_paper only inserts or deletes the Vote row (the
+unique constraint decides vote vs. unvote) and records a +1/-1 delta here.
+A background task flushes the summed deltas every VOTE_FLUSH_INTERVAL_MS with
+one `UPDATE papers SET vote_count = vote_count + :delta` per paper, so a
+trending paper's row is written a few times a second instead of once per click.
+Pending deltas are also flushed on shutdown.
+"""
+import asyncio
+import os
+import threading
+from collections import defaultdict
+
+from sqlalchemy import bindparam, select, update
+
+from cache import response_cache
+from database import SessionLocal
+from models import Paper
+import ranking
+
+VOTE_BUFFER_ENABLED = os.getenv("VOTE_BUFFER_ENABLED", "false").lower() in ("1", "true", "yes")
+VOTE_FLUSH_INTERVAL_MS = int(os.getenv("VOTE_FLUSH_INTERVAL_MS", "500"))
+
+papers_table = Paper.__table__
+
+
+class VoteBuffer:
+    def __init__(self, session_factory=SessionLocal, interval_ms: int = VOTE_FLUSH_INTERVAL_MS):
+        self.session_factory = session_factory
+        self.interval = interval_ms / 1000
+        self._deltas = defaultdict(int)
+        self._lock = threading.Lock()
+        # Only one flush writes at a time (timer and shutdown can overlap)
+        self._flush_lock = threading.Lock()
+
+    def add(self, paper_id: int, delta: int):
+        if delta:
+            with self._lock:
+                self._deltas[paper_id] += delta
+
+    def vote_count(self, db, paper_id: int) -> int:
+        """Committed vote_count plus pending votes, as one consistent snapshot"""
+        # A flush takes the deltas out before its UPDATE commits; holding its lock
+        # means they're counted exactly once, either still pending or committed
+        with self._flush_lock:
+            committed = db.execute(select(Paper.vote_count).where(Paper.id == paper_id)).scalar() or 0
+            with self._lock:
+                return committed + self._deltas.get(paper_id, 0)
+
+    def flush(self) -> int:
+        """Apply all pending deltas in one transaction; returns the number of papers updated"""
+        with self._flush_lock:
+            with self._lock:
+                deltas = {paper_id: delta for paper_id, delta in self._deltas.items() if delta}
+                self._deltas.clear()
+            if not deltas:
+                return 0
+
+            db = self.session_factory()
+            try:
+                db.execute(
+                    update(papers_table)
+                    .where(papers_table.c.id == bindparam("paper_id"))
+                    .values(vote_count=papers_table.c.vote_count + bindparam("delta")),
+                    [{"paper_id": paper_id, "delta": delta} for paper_id, delta in deltas.items()]
+                )
+                ranking.rescore_papers(db, list(deltas))
+                arxiv_ids = db.execute(
+                    select(Paper.arxiv_id).where(Paper.id.in_(list(deltas)))
+                ).scalars().all()
+                db.commit()
+            except Exception:
+                db.rollback()
+                # Put the deltas back so the next flush retries them
+                for paper_id, delta in deltas.items():
+                    self.add(paper_id, delta)
+                raise
+            finally:
+                db.close()
+
+            response_cache.invalidate("papers", *(f"paper:{arxiv_id}" for arxiv_id in arxiv_ids))
+            return len(deltas)
+
+    async def run(self):
+        """Flush on a fixed interval until cancelled"""
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await loop.run_in_executor(None, self.flush)
+            except Exception as e:
+                print(f"❌ Error flushing vote buffer: {e}")
+
+
+vote_buffer = VoteBuffer()
@@ -60,9 +60,12 @@ export const updateProfile = async (bio) => {
 };
 
 // Paper functions
-export const getPapers = async (sort = 'votes', limit = 15000) => {
+export const getPapers = async ({ sort = 'hot', cat = 'all', window = '7d', cursor = null, limit = 30 } = {}) => {
+  const params = { sort, window, limit };
+  if (cat && cat !== 'all') params.cat = cat;
+  if (cursor) params.cursor = cursor;
   const response = await axios.get(`${API_BASE}/papers`, {
-    params: { sort, limit },
+    params,
     headers: getAuthHeader()
   });
   return response.data;
@@ -83,13 +86,47 @@ export const getPaper = async (arxivId) => {
   return response.data;
 };
 
+// Paper, first page of its comment tree and the caller's votes, in one request
+export const getPaperFull = async (arxivId) => {
+  const response = await axios.get(`${API_BASE}/papers/${arxivId}/full`, {
+    headers: getAuthHeader()
+  });
+  return response.data;
+};
+
 export const votePaper = async (arxivId, userId) => {
   const response = await axios.post(`${API_BASE}/papers/${arxivId}/vote`, null, {
-    params: { user_identifier: userId }
+    params: { user_identifier: userId },
+    headers: getAuthHeader()
   });
   return response.data;
 };
 
+// Which of these items the logged-in user has voted on, in one request
+export const getVoteStatus = async ({ paperIds = [], commentIds = [], postIds = [], postCommentIds = [] } = {}) => {
+  const response = await axios.post(
+    `${API_BASE}/votes/status`,
+    {
+      paper_ids: paperIds,
+      comment_ids: commentIds,
+      post_ids: postIds,
+      post_comment_ids: postCommentIds
+    },
+    { headers: getAuthHeader() }
+  );
+  return response.data;
+};
+
+// Live vote/comment counts for the given ids; returns a function that closes the stream
+export const subscribeCounts = ({ paperIds = [], postIds = [] }, onCounts) => {
+  const params = new URLSearchParams();
+  if (paperIds.length) params.set('papers', paperIds.join(','));
+  if (postIds.length) params.set('posts', postIds.join(','));
+  const source = new EventSource(`${API_BASE}/stream/counts?${params}`);
+  source.addEventListener('counts', (event) => onCounts(JSON.parse(event.data)));
+  return () => source.close();
+};
+
 // Comment functions
 export const getComments = async (arxivId) => {
   const response = await axios.get(`${API_BASE}/papers/${arxivId}/comments`, {
@@ -155,8 +192,12 @@ export const votePost = async (postId) => {
   return response.data;
 };
 
-export const getPostComments = async (postId) => {
-  const response = await axios.get(`${API_BASE}/posts/${postId}/comments`);
+export const getPostComments = async (postId, cursor = null) => {
+  const params = cursor ? { cursor } : {};
+  const response = await axios.get(`${API_BASE}/posts/${postId}/comments`, {
+    params,
+    headers: getAuthHeader()
+  });
   return response.data;
 };
 
@@ -8,9 +8,18 @@ export default function PaperCard({ paper, rank }) {
   const [voted, setVoted] = useState(false);
 
   useEffect(() => {
+    setVotes(paper.vote_count);
+  }, [paper.vote_count]);
+
+  useEffect(() => {
+    // Prefer the server's vote state when the feed resolved it
+    if (paper.user_voted !== undefined) {
+      setVoted(paper.user_voted);
+      return;
+    }
     const votedPapers = JSON.parse(localStorage.getItem('votedPapers') || '{}');
     setVoted(!!votedPapers[paper.arxiv_id]);
-  }, [paper.arxiv_id]);
+  }, [paper.arxiv_id, paper.user_voted]);
 
   const handleVote = async (e) => {
     e.preventDefault();
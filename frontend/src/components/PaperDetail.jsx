@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { Helmet } from 'react-helmet-async';
-import { getPaper, getComments, addComment, votePaper, voteComment, deleteComment } from '../api';
+import { getPaperFull, getComments, addComment, votePaper, voteComment, deleteComment } from '../api';
 
 export default function PaperDetail() {
   const { arxivId } = useParams();
@@ -12,33 +12,40 @@ export default function PaperDetail() {
   const [commentLoading, setCommentLoading] = useState(false);
   const [newComment, setNewComment] = useState('');
   const [voted, setVoted] = useState(false);
+  const [hasMoreComments, setHasMoreComments] = useState(false);
   const [replyTo, setReplyTo] = useState(null); // Track which comment we're replying to
   const [replyText, setReplyText] = useState('');
 
   useEffect(() => {
-    loadPaper();
-    loadComments();
-
-    // Check if already voted
-    const votedPapers = JSON.parse(localStorage.getItem('votedPapers') || '{}');
-    setVoted(!!votedPapers[arxivId]);
+    setLoading(true);
+    loadPaper().finally(() => setLoading(false));
   }, [arxivId]);
 
+  // Paper, comments and vote state in one request
   const loadPaper = async () => {
-    setLoading(true);
     try {
-      const data = await getPaper(arxivId);
-      setPaper(data);
+      const data = await getPaperFull(arxivId);
+      setPaper(data.paper);
+      setComments(data.comments);
+      setHasMoreComments(data.has_more_comments);
+      if (data.user_voted !== null) {
+        setVoted(data.user_voted);
+      } else {
+        // Anonymous: the server can't tell browsers apart, so use this browser's record
+        const votedPapers = JSON.parse(localStorage.getItem('votedPapers') || '{}');
+        setVoted(!!votedPapers[arxivId]);
+      }
     } catch (error) {
       console.error('Failed to load paper:', error);
     }
-    setLoading(false);
   };
 
+  // Every thread, for papers with more than the first page
   const loadComments = async () => {
     try {
       const data = await getComments(arxivId);
       setComments(data);
+      setHasMoreComments(false);
     } catch (error) {
       console.error('Failed to load comments:', error);
     }
@@ -60,7 +67,6 @@ export default function PaperDetail() {
     try {
       await addComment(arxivId, newComment);
       setNewComment('');
-      await loadComments();
       await loadPaper();
     } catch (error) {
       console.error('Failed to add comment:', error);
@@ -104,7 +110,8 @@ export default function PaperDetail() {
 
     try {
       await voteComment(commentId);
-      await loadComments();
+      // Refresh whichever view is showing: the first page or every thread
+      await (hasMoreComments ? loadPaper() : loadComments());
     } catch (error) {
       console.error('Failed to vote comment:', error);
       if (error.response?.status === 401) {
@@ -131,7 +138,6 @@ export default function PaperDetail() {
       await addComment(arxivId, replyText, parentId);
       setReplyText('');
       setReplyTo(null);
-      await loadComments();
       await loadPaper();
     } catch (error) {
       console.error('Failed to add reply:', error);
@@ -152,7 +158,6 @@ export default function PaperDetail() {
 
     try {
       await deleteComment(commentId);
-      await loadComments();
       await loadPaper();
     } catch (error) {
       console.error('Failed to delete comment:', error);
@@ -514,6 +519,19 @@ export default function PaperDetail() {
         <table style={{ border: '0px', padding: '0px', borderCollapse: 'collapse', borderSpacing: '0px' }} className="itemlist">
           <tbody>
             {comments.map((comment, index) => renderComment(comment, 0, `${index + 1}`, null))}
+            {hasMoreComments && (
+              <tr>
+                <td className="title">
+                  <a
+                    onClick={loadComments}
+                    className="morelink"
+                    style={{ cursor: 'pointer' }}
+                  >
+                    More
+                  </a>
+                </td>
+              </tr>
+            )}
           </tbody>
         </table>
       </td>
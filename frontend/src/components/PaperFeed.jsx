@@ -1,11 +1,24 @@
 import { useState, useEffect } from 'react';
 import { useSearchParams } from 'react-router-dom';
 import { Helmet } from 'react-helmet-async';
-import { getPapers, searchPapers } from '../api';
+import { getPapers, getVoteStatus, searchPapers, subscribeCounts } from '../api';
 import PaperCard from './PaperCard';
 import { CATEGORY_MAP, ALL_CATEGORIES } from '../utils/categories';
 
 const POSTS_PER_PAGE = 30;
+// Only the most recently shown pages get a live counts stream (one connection each)
+const LIVE_PAGES = 2;
+
+// Subscribes one page of papers to live counts; a new page opens its own stream
+// instead of reopening one for everything shown so far
+function LiveCounts({ paperIds, onCounts }) {
+  const paperIdsKey = paperIds.join(',');
+  useEffect(() => {
+    if (!paperIdsKey) return;
+    return subscribeCounts({ paperIds: paperIdsKey.split(',') }, onCounts);
+  }, [paperIdsKey]);
+  return null;
+}
 
 export default function PaperFeed() {
   const [searchParams] = useSearchParams();
@@ -14,7 +27,9 @@ export default function PaperFeed() {
   const searchQuery = searchParams.get('q') || '';
   const [papers, setPapers] = useState([]);
   const [filteredPapers, setFilteredPapers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [page, setPage] = useState(1);
 
   // Check if we have any query parameters
@@ -22,24 +37,34 @@ export default function PaperFeed() {
 
   useEffect(() => {
     loadPapers();
-  }, [searchQuery]);
+  }, [searchQuery, category, sortBy]);
 
   useEffect(() => {
     filterAndSortPapers();
   }, [papers, category, sortBy, searchQuery]);
 
+  // Live vote and comment counts from a page's counts stream
+  const applyCounts = (update) => {
+    const changes = update.papers || {};
+    setPapers(prev => prev.map(paper => (
+      changes[paper.id] ? { ...paper, ...changes[paper.id] } : paper
+    )));
+  };
+
   const loadPapers = async () => {
     setLoading(true);
+    setPage(1);
     try {
       // If searching, use search endpoint to find papers across all time
       if (searchQuery) {
         const data = await searchPapers(searchQuery, 1000);
         setPapers(data);
+        setNextCursor(null);
       } else {
-        // Otherwise fetch from last 7 days
-        const apiSort = sortBy === 'hot' ? 'votes' : sortBy === 'discussed' ? 'comments' : 'recent';
-        const data = await getPapers(apiSort, 15000);
-        setPapers(data);
+        // Otherwise fetch the first page of the last 7 days, filtered and sorted server-side
+        const data = await getPapers({ sort: sortBy, cat: category, window: '7d', limit: POSTS_PER_PAGE });
+        setPapers(await withVoteStatus(data.papers));
+        setNextCursor(data.next_cursor);
       }
     } catch (error) {
       console.error('Failed to load papers:', error);
@@ -47,89 +72,62 @@ export default function PaperFeed() {
     setLoading(false);
   };
 
+  // Mark the papers the user has voted on, resolved for the whole page at once.
+  // Anonymous votes aren't per-browser on the server, so PaperCard keeps using localStorage for those.
+  const withVoteStatus = async (pagePapers) => {
+    if (pagePapers.length === 0 || !localStorage.getItem('authToken')) return pagePapers;
+    try {
+      const status = await getVoteStatus({ paperIds: pagePapers.map(paper => paper.id) });
+      const voted = new Set(status.paper_ids);
+      return pagePapers.map(paper => ({ ...paper, user_voted: voted.has(paper.id) }));
+    } catch (error) {
+      console.error('Failed to load vote status:', error);
+      return pagePapers;
+    }
+  };
+
+  const loadMorePapers = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const data = await getPapers({ sort: sortBy, cat: category, window: '7d', cursor: nextCursor, limit: POSTS_PER_PAGE });
+      const morePapers = await withVoteStatus(data.papers);
+      setPapers(prev => [...prev, ...morePapers]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Failed to load more papers:', error);
+    }
+    setLoadingMore(false);
+  };
+
   const filterAndSortPapers = () => {
-    let filtered = papers;
-    
-    // Filter by search query
-    if (searchQuery) {
-      const query = searchQuery.toLowerCase();
-      filtered = filtered.filter(p => {
-        try {
-          // Title match
-          const titleMatch = p.title && p.title.toLowerCase().includes(query);
-          
-          // Abstract match
-          const abstractMatch = p.abstract && p.abstract.toLowerCase().includes(query);
-          
-          // Author match - handle both string and array
-          let authorMatch = false;
-          if (p.authors) {
-            if (typeof p.authors === 'string') {
-              authorMatch = p.authors.toLowerCase().includes(query);
-            } else if (Array.isArray(p.authors)) {
-              authorMatch = p.authors.some(author => 
-                author.toLowerCase().includes(query)
-              );
-            }
-          }
-          
-          return titleMatch || abstractMatch || authorMatch;
-        } catch (error) {
-          console.error('Error filtering paper:', error, p);
-          return false;
-        }
-      });
+    // The feed endpoint already filters and sorts; only search results are refined here
+    if (!searchQuery) {
+      setFilteredPapers(papers);
+      return;
     }
-    
+
+    // Text matching and ranking happen in the search index on the server
+    let filtered = papers;
+
     // Filter by category
     if (category !== 'all') {
-      filtered = filtered.filter(p => 
+      filtered = filtered.filter(p =>
         p.categories.some(cat => cat.startsWith(category))
       );
     }
-    
-    // Client-side sorting (only apply 7-day filter if NOT searching)
-    if (!searchQuery) {
-      if (sortBy === 'hot') {
-        // Filter to last 7 days, then sort by votes (highest first)
-        const oneWeekAgo = new Date();
-        oneWeekAgo.setDate(oneWeekAgo.getDate() - 7);
 
-        filtered = filtered
-          .filter(p => new Date(p.published) >= oneWeekAgo)
-          .sort((a, b) => b.vote_count - a.vote_count);
-      } else if (sortBy === 'discussed') {
-        // Filter to last 7 days, then sort by comments (most discussed first)
-        const oneWeekAgo = new Date();
-        oneWeekAgo.setDate(oneWeekAgo.getDate() - 7);
-
-        filtered = filtered
-          .filter(p => new Date(p.published) >= oneWeekAgo)
-          .sort((a, b) => b.comment_count - a.comment_count);
-      } else if (sortBy === 'new') {
-        // Filter to last 7 days, then sort by publication date (newest first)
-        const oneWeekAgo = new Date();
-        oneWeekAgo.setDate(oneWeekAgo.getDate() - 7);
-
-        filtered = filtered
-          .filter(p => new Date(p.published) >= oneWeekAgo)
-          .sort((a, b) =>
-            new Date(b.published).getTime() - new Date(a.published).getTime()
-          );
-      }
-    } else {
-      // When searching, sort by the selected method (hot/discussed/new) without 7-day filter
-      if (sortBy === 'hot') {
-        filtered = filtered.sort((a, b) => b.vote_count - a.vote_count);
-      } else if (sortBy === 'discussed') {
-        filtered = filtered.sort((a, b) => b.comment_count - a.comment_count);
-      } else if (sortBy === 'new') {
-        filtered = filtered.sort((a, b) =>
-          new Date(b.published).getTime() - new Date(a.published).getTime()
-        );
-      }
+    // When searching, sort by the selected method (hot/discussed/new) without 7-day filter
+    if (sortBy === 'hot') {
+      filtered = filtered.sort((a, b) => b.vote_count - a.vote_count);
+    } else if (sortBy === 'discussed') {
+      filtered = filtered.sort((a, b) => b.comment_count - a.comment_count);
+    } else if (sortBy === 'new') {
+      filtered = filtered.sort((a, b) =>
+        new Date(b.published).getTime() - new Date(a.published).getTime()
+      );
     }
-    
+
     setFilteredPapers(filtered);
   };
 
@@ -191,8 +189,15 @@ export default function PaperFeed() {
     );
   }
 
-  const displayedPapers = filteredPapers.slice(0, POSTS_PER_PAGE * page);
-  const hasMore = filteredPapers.length > displayedPapers.length;
+  // Search results are paged client-side; the feed pages through the API cursor
+  const displayedPapers = searchQuery ? filteredPapers.slice(0, POSTS_PER_PAGE * page) : filteredPapers;
+  const hasMore = searchQuery ? filteredPapers.length > displayedPapers.length : !!nextCursor;
+  const handleMore = () => (searchQuery ? setPage(page + 1) : loadMorePapers());
+
+  const livePages = [];
+  for (let start = 0; start < displayedPapers.length; start += POSTS_PER_PAGE) {
+    livePages.push(displayedPapers.slice(start, start + POSTS_PER_PAGE).map(paper => paper.id));
+  }
 
   return (
     <>
@@ -239,13 +244,20 @@ export default function PaperFeed() {
                       <b style={{ color: '#000000' }}>"{searchQuery}"</b>
                     </>
                   )}
-                  {' '}
-                  ({filteredPapers.length} paper{filteredPapers.length !== 1 ? 's' : ''})
+                  {searchQuery && (
+                    <>
+                      {' '}
+                      ({filteredPapers.length} paper{filteredPapers.length !== 1 ? 's' : ''})
+                    </>
+                  )}
                 </span>
               </td>
             </tr>
             <tr style={{ height: '5px' }} />
             
+            {livePages.slice(-LIVE_PAGES).map(paperIds => (
+              <LiveCounts key={paperIds.join(',')} paperIds={paperIds} onCounts={applyCounts} />
+            ))}
             {displayedPapers.map((paper, index) => (
               <PaperCard key={paper.id} paper={paper} rank={index + 1} />
             ))}
@@ -256,11 +268,11 @@ export default function PaperFeed() {
                 <td key="morelinktd" className="title">
                   <a
                     key="morelink"
-                    onClick={() => setPage(page + 1)}
+                    onClick={handleMore}
                     className="morelink"
                     style={{ cursor: 'pointer' }}
                   >
-                    More
+                    {loadingMore ? 'Loading...' : 'More'}
                   </a>
                 </td>
               </tr>
@@ -7,6 +7,8 @@ export default function PostDetail() {
   const navigate = useNavigate();
   const [post, setPost] = useState(null);
   const [comments, setComments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [newComment, setNewComment] = useState('');
   const [commentLoading, setCommentLoading] = useState(false);
@@ -32,12 +34,26 @@ export default function PostDetail() {
   const loadComments = async () => {
     try {
       const data = await getPostComments(postId);
-      setComments(data);
+      setComments(data.comments);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       console.error('Failed to load comments:', error);
     }
   };
 
+  const loadMoreComments = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const data = await getPostComments(postId, nextCursor);
+      setComments(prev => [...prev, ...data.comments]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Failed to load more comments:', error);
+    }
+    setLoadingMore(false);
+  };
+
   const handleAddComment = async (e) => {
     e.preventDefault();
 
@@ -342,6 +358,19 @@ export default function PostDetail() {
             ) : (
               comments.map((comment, index) => renderComment(comment, index))
             )}
+            {nextCursor && (
+              <tr>
+                <td className="title">
+                  <a
+                    onClick={loadMoreComments}
+                    className="morelink"
+                    style={{ cursor: 'pointer' }}
+                  >
+                    {loadingMore ? 'Loading...' : 'More'}
+                  </a>
+                </td>
+              </tr>
+            )}
           </tbody>
         </table>
 